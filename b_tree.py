@@ -0,0 +1,245 @@
+"""B+树"""
+
+from bisect import bisect_left, bisect_right
+
+from obj import BTreeNode
+from exception import TreeError
+
+
+class DictBTree:
+	"""
+	B+树（字典）类
+		·每个节点至多order个key，除根外至少(order - 1) // 2个，节点内用bisect二分
+		·元素只存放在叶节点，叶节点从左到右串成链表，区间迭代沿链表顺序扫描
+		·树高约log_{order/2}(n)，order为64时一百万个key的树高只有4~5层，
+		  每个节点只有一个节点对象和几个数组，对象个数约为二叉树的1/order
+		·search / insert / delete为O(log n)
+	"""
+
+	def __init__(self, order=64):
+		"""
+		:param order: 每个节点最多容纳的key个数，不小于3
+		"""
+		if order < 3:
+			raise ValueError("order must be at least 3")
+		self._order = order
+		self._min = (order - 1) // 2
+		self._root = BTreeNode()
+		self._len = 0
+
+	def __len__(self):
+		return self._len
+
+	def __str__(self):
+		return "{" + ", ".join(["{0}: {1}".format(k, v) for k, v in self.values()]) + "}"
+
+	def is_empty(self):
+		return self._len == 0
+
+	def _leaf(self, key):
+		"""key所在（或应插入）的叶节点"""
+		t = self._root
+		while not t.leaf:
+			t = t.children[bisect_right(t.keys, key)]
+		return t
+
+	def search(self, key):
+		t = self._leaf(key)
+		i = bisect_left(t.keys, key)
+		if i < len(t.keys) and t.keys[i] == key:
+			return t.vals[i]
+
+	def insert(self, key, value):
+		path, t = [], self._root        # path记录(内部节点, 子节点下标)
+		while not t.leaf:
+			i = bisect_right(t.keys, key)
+			path.append((t, i))
+			t = t.children[i]
+		i = bisect_left(t.keys, key)
+		if i < len(t.keys) and t.keys[i] == key:    # 覆盖原来的value
+			t.vals[i] = value
+			return
+		t.keys.insert(i, key)
+		t.vals.insert(i, value)
+		self._len += 1
+
+		# 自底向上分裂上溢的节点
+		while len(t.keys) > self._order:
+			sep, new = self._split(t)
+			if not path:                # 根节点分裂，树长高一层
+				root = BTreeNode(leaf=False)
+				root.keys = [sep]
+				root.children = [t, new]
+				self._root = root
+				return
+			t, i = path.pop()
+			t.keys.insert(i, sep)
+			t.children.insert(i + 1, new)
+
+	@staticmethod
+	def _split(t):
+		"""
+		把节点t对半分裂
+		:return: (分隔key, 新的右节点)
+		"""
+		mid = len(t.keys) // 2
+		new = BTreeNode(t.leaf)
+		if t.leaf:
+			new.keys, new.vals = t.keys[mid:], t.vals[mid:]
+			del t.keys[mid:], t.vals[mid:]
+			new.next, t.next = t.next, new
+			return new.keys[0], new
+		sep = t.keys[mid]           # 内部节点的中间key上移，不再保留
+		new.keys, new.children = t.keys[mid + 1:], t.children[mid + 1:]
+		del t.keys[mid:], t.children[mid + 1:]
+		return sep, new
+
+	def delete(self, key):
+		path, t = [], self._root
+		while not t.leaf:
+			i = bisect_right(t.keys, key)
+			path.append((t, i))
+			t = t.children[i]
+		i = bisect_left(t.keys, key)
+		if i == len(t.keys) or t.keys[i] != key:    # 树中不存在关键码key
+			return
+		del t.keys[i], t.vals[i]
+		self._len -= 1
+		# 删去叶节点的最小key后，祖先中的分隔key仍满足左 < 分隔key <= 右，不必修改
+
+		# 自底向上处理下溢：兄弟节点有富余则借一个，否则与兄弟合并
+		while path and len(t.keys) < self._min:
+			p, i = path.pop()
+			if i > 0 and len(p.children[i - 1].keys) > self._min:
+				self._borrow_left(p, i)
+				return
+			if i + 1 < len(p.children) and len(p.children[i + 1].keys) > self._min:
+				self._borrow_right(p, i)
+				return
+			self._merge(p, i - 1 if i > 0 else i)
+			t = p
+		if not self._root.leaf and not self._root.keys:     # 根节点只剩一个子节点，树降低一层
+			self._root = self._root.children[0]
+
+	@staticmethod
+	def _borrow_left(p, i):
+		"""p.children[i]从左兄弟借一个元素"""
+		t, left = p.children[i], p.children[i - 1]
+		if t.leaf:
+			t.keys.insert(0, left.keys.pop())
+			t.vals.insert(0, left.vals.pop())
+			p.keys[i - 1] = t.keys[0]
+		else:
+			t.keys.insert(0, p.keys[i - 1])
+			t.children.insert(0, left.children.pop())
+			p.keys[i - 1] = left.keys.pop()
+
+	@staticmethod
+	def _borrow_right(p, i):
+		"""p.children[i]从右兄弟借一个元素"""
+		t, right = p.children[i], p.children[i + 1]
+		if t.leaf:
+			t.keys.append(right.keys.pop(0))
+			t.vals.append(right.vals.pop(0))
+			p.keys[i] = right.keys[0]
+		else:
+			t.keys.append(p.keys[i])
+			t.children.append(right.children.pop(0))
+			p.keys[i] = right.keys.pop(0)
+
+	@staticmethod
+	def _merge(p, i):
+		"""把p.children[i + 1]合并到p.children[i]"""
+		left, right = p.children[i], p.children[i + 1]
+		if left.leaf:
+			left.keys += right.keys
+			left.vals += right.vals
+			left.next = right.next
+		else:
+			left.keys.append(p.keys[i])
+			left.keys += right.keys
+			left.children += right.children
+		del p.keys[i], p.children[i + 1]
+
+	def values(self):
+		"""字典迭代器，沿叶节点链表按key升序返回(key, value)"""
+		return self.range()
+
+	def range(self, lo=None, hi=None):
+		"""区间迭代器：按key升序返回lo <= key < hi的(key, value)，lo、hi为None时不设界"""
+		if lo is None:
+			t, i = self._root, 0
+			while not t.leaf:
+				t = t.children[0]
+		else:
+			t = self._leaf(lo)
+			i = bisect_left(t.keys, lo)
+		while t is not None:
+			keys, vals = t.keys, t.vals
+			end = len(keys) if hi is None or not keys or keys[-1] < hi else bisect_left(keys, hi)
+			for j in range(i, end):
+				yield keys[j], vals[j]
+			if end < len(keys):
+				return
+			t, i = t.next, 0
+
+	def items_from(self, key):
+		"""从第一个不小于key的元素开始，按key升序返回(key, value)"""
+		return self.range(key)
+
+	def height(self):
+		h, t = 1, self._root
+		while not t.leaf:
+			h += 1
+			t = t.children[0]
+		return h
+
+	def audit(self):
+		"""
+		检查B+树性质：各节点key个数在范围内且有序、分隔key界定子树、叶节点同深度、叶节点链表完整
+		:return: 树高
+		:raise TreeError: 不满足时抛出
+		"""
+		leaves = []
+
+		def check(t, lo, hi, depth):
+			keys = t.keys
+			if len(keys) > self._order or (t is not self._root and len(keys) < self._min):
+				raise TreeError("node with {} keys".format(len(keys)))
+			if any(not a < b for a, b in zip(keys, keys[1:])):
+				raise TreeError("keys out of order in node")
+			if keys and (lo is not None and keys[0] < lo or hi is not None and not keys[-1] < hi):
+				raise TreeError("keys outside separator bounds")
+			if t.leaf:
+				leaves.append((t, depth))
+				return
+			if len(t.children) != len(keys) + 1:
+				raise TreeError("internal node has {} keys and {} children".format(len(keys), len(t.children)))
+			bounds = [lo] + keys + [hi]
+			for c, a, b in zip(t.children, bounds, bounds[1:]):
+				check(c, a, b, depth + 1)
+
+		check(self._root, None, None, 1)
+		if len(set(d for _, d in leaves)) > 1:
+			raise TreeError("leaves at different depths")
+		for (a, _), (b, _) in zip(leaves, leaves[1:] + [(None, 0)]):
+			if a.next is not b:
+				raise TreeError("broken leaf chain")
+		if sum(len(t.keys) for t, _ in leaves) != self._len:
+			raise TreeError("length mismatch")
+		return leaves[0][1]
+
+
+if __name__ == '__main__':
+	from random import randint
+	from random import seed
+	seed(0)
+	d = DictBTree(order=4)
+	for ii in range(20):
+		d.insert(randint(0, 100), ii)
+	print(d, d.height())
+	print(d.search(49), d.search(1000))
+	print(list(d.range(20, 60)))
+	for ii in range(0, 101, 2):
+		d.delete(ii)
+	print(d, d.height())
@@ -1,8 +1,9 @@
-"""平衡二叉排序树（AVL树）"""
+"""平衡二叉排序树（AVL树、红黑树）"""
 
-from obj import AVLNode
+from obj import AVLNode, RBNode, subtree_size
 from binary_sort_tree import DictBinTree, build_dict_bin_tree
 from dictionary import Assoc
+from exception import TreeError
 
 
 class DictAVL(DictBinTree):
@@ -16,7 +17,11 @@ class DictAVL(DictBinTree):
 		"""LL型调整：a的左子树较高，新节点插入在a的左子树的左子树"""
 		a.left = b.right
 		b.right = a
-		a.bf = b.bf = 0
+		b.size, a.size = a.size, 1 + subtree_size(a.left) + subtree_size(a.right)
+		if b.bf == 0:       # 只在删除时出现，调整后高度不变
+			a.bf, b.bf = 1, -1
+		else:
+			a.bf = b.bf = 0
 		return b
 	
 	@staticmethod
@@ -24,7 +29,11 @@ class DictAVL(DictBinTree):
 		"""RR型调整：a的右子树较高，新节点插入在a右子树的右子树"""
 		a.right = b.left
 		b.left = a
-		a.bf = b.bf = 0
+		b.size, a.size = a.size, 1 + subtree_size(a.left) + subtree_size(a.right)
+		if b.bf == 0:       # 只在删除时出现，调整后高度不变
+			a.bf, b.bf = -1, 1
+		else:
+			a.bf = b.bf = 0
 		return b
 	
 	@staticmethod
@@ -33,6 +42,9 @@ class DictAVL(DictBinTree):
 		c = b.right
 		a.left, b.right = c.right, c.left
 		c.left, c.right = b, a
+		c.size = a.size
+		a.size = 1 + subtree_size(a.left) + subtree_size(a.right)
+		b.size = 1 + subtree_size(b.left) + subtree_size(b.right)
 		if c.bf == 0:       # c本身就是插入节点
 			a.bf = b.bf = 0
 		elif c.bf == 1:     # 新节点在c的左子树
@@ -50,6 +62,9 @@ class DictAVL(DictBinTree):
 		c = b.left
 		a.right, b.left = c.left, c.right
 		c.left, c.right = a, b
+		c.size = a.size
+		a.size = 1 + subtree_size(a.left) + subtree_size(a.right)
+		b.size = 1 + subtree_size(b.left) + subtree_size(b.right)
 		if c.bf == 0:       # c本身就是插入节点
 			a.bf = 0
 			b.bf = 0
@@ -70,10 +85,12 @@ class DictAVL(DictBinTree):
 			return
 		
 		pa = q = None       # 维持pa，q为a，p的父节点
+		path = []           # 插入成功时路径上各节点的size加1
 		while p is not None:        # 确定插入位置及最小非平衡子树
 			if key == p.elem.key:       # key存在，修改关联值并结束
 				p.elem.value = value
 				return
+			path.append(p)
 			if p.bf != 0:
 				pa, a = q, p        # 已知最小非平衡子树
 			q = p
@@ -88,6 +105,8 @@ class DictAVL(DictBinTree):
 			q.left = node           # 作为左子节点
 		else:
 			q.right = node          # 或右节点
+		for t in path:
+			t.size += 1
 		# 新节点已插入，a是最小不平衡子树
 		if key < a.elem.key:        # 新节点在a的左子树
 			p = b = a.left
@@ -130,6 +149,273 @@ class DictAVL(DictBinTree):
 				pa.left = b
 			else:
 				pa.right = b
+	
+	def delete(self, key):
+		"""
+		删除key，从被删节点的父节点开始沿路径回溯修改BF，失衡处旋转，
+		子树高度不再降低时停止，最坏O(log n)
+		"""
+		path, q = [], self._root      # path记录(节点, 方向)，方向1表示走向左子树，-1表示右子树
+		while q is not None and q.elem.key != key:
+			if key < q.elem.key:
+				path.append((q, 1))
+				q = q.left
+			else:
+				path.append((q, -1))
+				q = q.right
+		if q is None:       # 树中不存在关键码key
+			return
+		
+		if q.left is not None and q.right is not None:      # 有两个子节点，用左子树的最右节点代替
+			path.append((q, 1))
+			r = q.left
+			while r.right is not None:
+				path.append((r, -1))
+				r = r.right
+			q.elem = r.elem
+			q = r
+		child = q.left if q.left is not None else q.right   # 此时q至多有一个子节点
+		self._replace(path, len(path) - 1, child)
+		for t, _ in path:
+			t.size -= 1
+		
+		# 回溯：path[i]方向d上的子树高度降低了1
+		i = len(path) - 1
+		while i >= 0:
+			a, d = path[i]
+			if a.bf == d:               # 原来较高的一侧降低，a的高度也降低，继续回溯
+				a.bf = 0
+				i -= 1
+				continue
+			if a.bf == 0:               # 原来等高，a的高度不变
+				a.bf = -d
+				return
+			# 较低的一侧又降低，失衡
+			if d == 1:
+				b = a.right
+				if b.bf == 1:
+					b = self.RL(a, b)
+				else:
+					b = self.RR(a, b)
+			else:
+				b = a.left
+				if b.bf == -1:
+					b = self.LR(a, b)
+				else:
+					b = self.LL(a, b)
+			self._replace(path, i - 1, b)
+			if b.bf != 0:               # 旋转后子树高度不变
+				return
+			i -= 1
+	
+	def _replace(self, path, i, node):
+		"""用node替换path[i]的节点在方向d上的子节点，i < 0时替换树根"""
+		if i < 0:
+			self._root = node
+			return
+		p, d = path[i]
+		if d == 1:
+			p.left = node
+		else:
+			p.right = node
+	
+	def audit(self):
+		"""
+		检查AVL性质：中序有序、每个节点的BF等于左右子树高度差且绝对值不超过1
+		:return: 树的高度
+		:raise TreeError: 不满足时抛出
+		"""
+		def check(t, lo, hi):
+			if t is None:
+				return 0
+			k = t.elem.key
+			if lo is not None and not lo < k or hi is not None and not k < hi:
+				raise TreeError("key {} out of order".format(k))
+			hl, hr = check(t.left, lo, k), check(t.right, k, hi)
+			if t.bf != hl - hr or abs(t.bf) > 1:
+				raise TreeError("bad balance factor at key {}: bf={}, heights {}/{}".format(k, t.bf, hl, hr))
+			return max(hl, hr) + 1
+		return check(self._root, None, None)
+
+
+def _red(t):
+	return t is not None and t.red
+
+
+class DictRBTree(DictBinTree):
+	"""
+	红黑树
+		·节点带父节点引用，空子树用None表示（视为黑色），不设哨兵节点
+		·插入至多2次旋转，删除至多3次旋转，比AVL树的回溯调整更少，适合写多的场景
+		·search、values沿用DictBinTree
+	"""
+	
+	def __init__(self):
+		super(DictRBTree, self).__init__()
+	
+	def _rotate_left(self, x):
+		y = x.right
+		x.right = y.left
+		if y.left is not None:
+			y.left.parent = x
+		self._transplant(x, y)
+		y.left = x
+		x.parent = y
+		y.size, x.size = x.size, 1 + subtree_size(x.left) + subtree_size(x.right)
+	
+	def _rotate_right(self, x):
+		y = x.left
+		x.left = y.right
+		if y.right is not None:
+			y.right.parent = x
+		self._transplant(x, y)
+		y.right = x
+		x.parent = y
+		y.size, x.size = x.size, 1 + subtree_size(x.left) + subtree_size(x.right)
+	
+	def _transplant(self, u, v):
+		"""在u的父节点中用v替换u"""
+		p = u.parent
+		if p is None:
+			self._root = v
+		elif u is p.left:
+			p.left = v
+		else:
+			p.right = v
+		if v is not None:
+			v.parent = p
+	
+	def insert(self, key, value):
+		p, q = None, self._root
+		while q is not None:
+			if key == q.elem.key:       # key存在，修改关联值并结束
+				q.elem.value = value
+				return
+			p = q
+			q = q.left if key < q.elem.key else q.right
+		z = RBNode(Assoc(key, value), p)
+		if p is None:
+			self._root = z
+		elif key < p.elem.key:
+			p.left = z
+		else:
+			p.right = z
+		while p is not None:        # 祖先的size加1
+			p.size += 1
+			p = p.parent
+		
+		# 修正连续的红节点：叔节点为红则变色上移，否则旋转后结束
+		while _red(z.parent):
+			p = z.parent
+			g = p.parent            # 父节点为红，一定不是根，g存在
+			if p is g.left:
+				u = g.right
+				if _red(u):
+					p.red = u.red = False
+					g.red = True
+					z = g
+					continue
+				if z is p.right:
+					self._rotate_left(p)
+					z, p = p, z
+				p.red, g.red = False, True
+				self._rotate_right(g)
+			else:
+				u = g.left
+				if _red(u):
+					p.red = u.red = False
+					g.red = True
+					z = g
+					continue
+				if z is p.left:
+					self._rotate_right(p)
+					z, p = p, z
+				p.red, g.red = False, True
+				self._rotate_left(g)
+		self._root.red = False
+	
+	def delete(self, key):
+		z = self._root
+		while z is not None and z.elem.key != key:
+			z = z.left if key < z.elem.key else z.right
+		if z is None:       # 树中不存在关键码key
+			return
+		if z.left is not None and z.right is not None:      # 有两个子节点，用后继代替
+			s = z.right
+			while s.left is not None:
+				s = s.left
+			z.elem = s.elem
+			z = s
+		x, p = z.left if z.left is not None else z.right, z.parent      # z至多有一个子节点
+		self._transplant(z, x)
+		a = p
+		while a is not None:        # 祖先的size减1
+			a.size -= 1
+			a = a.parent
+		if z.red:
+			return
+		
+		# 删去的是黑节点，x所在路径少一个黑节点；x可能为None，故单独维持其父节点p
+		while x is not self._root and not _red(x):
+			if x is p.left:
+				w = p.right         # x一侧缺黑，兄弟w一定存在
+				if w.red:
+					w.red, p.red = False, True
+					self._rotate_left(p)
+					w = p.right
+				if not _red(w.left) and not _red(w.right):
+					w.red = True
+					x, p = p, p.parent
+					continue
+				if not _red(w.right):
+					w.left.red, w.red = False, True
+					self._rotate_right(w)
+					w = p.right
+				w.red, p.red, w.right.red = p.red, False, False
+				self._rotate_left(p)
+			else:
+				w = p.left
+				if w.red:
+					w.red, p.red = False, True
+					self._rotate_right(p)
+					w = p.left
+				if not _red(w.left) and not _red(w.right):
+					w.red = True
+					x, p = p, p.parent
+					continue
+				if not _red(w.left):
+					w.right.red, w.red = False, True
+					self._rotate_left(w)
+					w = p.left
+				w.red, p.red, w.left.red = p.red, False, False
+				self._rotate_right(p)
+			x = self._root
+		if x is not None:
+			x.red = False
+	
+	def audit(self):
+		"""
+		检查红黑树性质：中序有序、父节点引用正确、根为黑、红节点的子节点为黑、各路径黑节点数相同
+		:return: 黑高度
+		:raise TreeError: 不满足时抛出
+		"""
+		def check(t, parent, lo, hi):
+			if t is None:
+				return 1
+			k = t.elem.key
+			if t.parent is not parent:
+				raise TreeError("bad parent link at key {}".format(k))
+			if lo is not None and not lo < k or hi is not None and not k < hi:
+				raise TreeError("key {} out of order".format(k))
+			if t.red and (_red(t.left) or _red(t.right)):
+				raise TreeError("red node {} has a red child".format(k))
+			bl, br = check(t.left, t, lo, k), check(t.right, t, k, hi)
+			if bl != br:
+				raise TreeError("black height differs at key {}: {}/{}".format(k, bl, br))
+			return bl + (not t.red)
+		if _red(self._root):
+			raise TreeError("red root")
+		return check(self._root, None, None, None)
 
 
 if __name__ == '__main__':
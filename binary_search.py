@@ -1,18 +1,38 @@
-"""线性表的二分查找"""
+"""
+线性表的二分查找
 
+	lower_bound / upper_bound / equal_range / find 只在下标上操作，不复制切片，
+	可用于list、tuple、array.array、memoryview、mmap等任意支持len()和下标访问的有序序列
+"""
 
-def bi_search(alist: list, item):
-	"""递归二分查找"""
-	n = len(alist)
-	if n > 0:
-		mid = n // 2
-		if alist[mid] == item:
-			return True
-		elif item < alist[mid]:
-			return bi_search(alist[:mid], item)
-		else:
-			return bi_search(alist[mid + 1:], item)
-	return False
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from math import isqrt
+
+
+def _numpy():
+	"""按需导入NumPy：NumPy为可选依赖，缺失时返回None，批量查找退回纯Python实现"""
+	try:
+		import numpy
+	except ImportError:
+		return None
+	return numpy
+
+
+def bi_search(alist: list, item, first=0, last=None):
+	"""递归二分查找（在下标区间上递归，不复制切片）"""
+	if last is None:
+		last = len(alist) - 1
+	if first > last:
+		return False
+	mid = (first + last) // 2
+	if alist[mid] == item:
+		return True
+	elif item < alist[mid]:
+		return bi_search(alist, item, first, mid - 1)
+	else:
+		return bi_search(alist, item, mid + 1, last)
 
 
 def bi_search2(alist: list, item):
@@ -30,9 +50,399 @@ def bi_search2(alist: list, item):
 	return False
 
 
+def _check_bounds(seq, lo, hi):
+	if hi is None:
+		hi = len(seq)
+	if lo < 0 or hi > len(seq) or lo > hi:
+		raise ValueError("lo and hi must satisfy 0 <= lo <= hi <= len(seq).")
+	return hi
+
+
+def lower_bound(seq, item, lo=0, hi=None, key=None):
+	"""
+	返回seq[lo:hi]中第一个不小于item的元素的下标，不存在时返回hi
+	:param seq: 有序序列
+	:param item: 待查找的值（指定key时为key空间中的值）
+	:param lo: 查找区间起点
+	:param hi: 查找区间终点（不含），默认为len(seq)
+	:param key: 键函数，对seq中的元素求键后再比较
+	:return: 插入点下标
+	"""
+	hi = _check_bounds(seq, lo, hi)
+	if key is None:
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if seq[mid] < item:
+				lo = mid + 1
+			else:
+				hi = mid
+	else:
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if key(seq[mid]) < item:
+				lo = mid + 1
+			else:
+				hi = mid
+	return lo
+
+
+def upper_bound(seq, item, lo=0, hi=None, key=None):
+	"""返回seq[lo:hi]中第一个大于item的元素的下标，不存在时返回hi，参数同lower_bound"""
+	hi = _check_bounds(seq, lo, hi)
+	if key is None:
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if item < seq[mid]:
+				hi = mid
+			else:
+				lo = mid + 1
+	else:
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if item < key(seq[mid]):
+				hi = mid
+			else:
+				lo = mid + 1
+	return lo
+
+
+def equal_range(seq, item, lo=0, hi=None, key=None):
+	"""返回(first, last)，seq[first:last]为所有等于item的元素，参数同lower_bound"""
+	hi = _check_bounds(seq, lo, hi)
+	first = lower_bound(seq, item, lo, hi, key)
+	return first, upper_bound(seq, item, first, hi, key)
+
+
+def find(seq, item, lo=0, hi=None, key=None):
+	"""返回第一个等于item的元素的下标，不存在时返回-1，参数同lower_bound"""
+	hi = _check_bounds(seq, lo, hi)
+	i = lower_bound(seq, item, lo, hi, key)
+	if i < hi and (seq[i] if key is None else key(seq[i])) == item:
+		return i
+	return -1
+
+
+def _gallop(seq, item, lo, hi, right=False, key=None):
+	"""从lo开始以1, 2, 4, ...的步长向右飞奔，找到包含插入点的区间后再二分"""
+	end, step = lo, 1
+	if right:
+		while end < hi and not item < (seq[end] if key is None else key(seq[end])):
+			lo, end, step = end + 1, end + step, step << 1
+		return upper_bound(seq, item, lo, min(end, hi), key)
+	while end < hi and (seq[end] if key is None else key(seq[end])) < item:
+		lo, end, step = end + 1, end + step, step << 1
+	return lower_bound(seq, item, lo, min(end, hi), key)
+
+
+def batch_search(seq, queries, side='left', key=None):
+	"""
+	批量二分查找：一次返回所有查询的插入点
+		·seq为NumPy数组或数值型array.array时直接调用numpy.searchsorted
+		·否则将查询排序一次，按从小到大的顺序依次查找，每次从上一个结果处飞奔，
+		  总代价O(m log m + m log(n / m))
+	:param seq: 有序序列
+	:param queries: 查询值序列
+	:param side: 'left'返回lower_bound，'right'返回upper_bound
+	:param key: 键函数（仅纯Python路径）
+	:return: 与queries一一对应的下标；queries为NumPy数组时返回NumPy数组，否则返回列表
+	"""
+	if side not in ('left', 'right'):
+		raise ValueError("in batch_search(): side must be 'left' or 'right'.")
+	np = None
+	if key is None:
+		if isinstance(seq, array) and seq.typecode not in 'uw':
+			np = _numpy()
+		else:
+			np = sys.modules.get('numpy')       # 输入是ndarray时NumPy必然已被导入，不必在此导入
+			if np is not None and not isinstance(seq, np.ndarray):
+				np = None
+	if np is not None:
+		res = np.searchsorted(np.asarray(seq), np.asarray(queries), side=side)
+		return res if isinstance(queries, np.ndarray) else res.tolist()
+
+	m, n = len(queries), len(seq)
+	res, pos = [0] * m, 0
+	for i in sorted(range(m), key=queries.__getitem__):
+		pos = _gallop(seq, queries[i], pos, n, side == 'right', key)
+		res[i] = pos
+	return res
+
+
+def batch_contains(seq, queries, key=None):
+	"""批量成员判断，返回与queries一一对应的布尔值，参数同batch_search"""
+	pos = batch_search(seq, queries, 'left', key)
+	n = len(seq)
+	np = sys.modules.get('numpy')
+	if np is not None and isinstance(pos, np.ndarray):
+		arr = np.asarray(seq)
+		hit = pos < n
+		hit[hit] = arr[pos[hit]] == np.asarray(queries)[hit]
+		return hit
+	if key is None:
+		return [p < n and seq[p] == q for p, q in zip(pos, queries)]
+	return [p < n and key(seq[p]) == q for p, q in zip(pos, queries)]
+
+
+def interpolation_search(seq, item, lo=0, hi=None):
+	"""
+	插值查找：返回seq[lo:hi]中item的插入点（同lower_bound），仅适用于数值键
+		·按item在区间端点值之间的比例估计位置，再在估计点一侧相距√width处放一个守卫探测，
+		  均匀分布时每轮区间缩小到约√width，约O(log log n)次探测
+		·某轮没有使区间缩小一半时，下一轮改用二分中点，最坏仍为O(log n)
+	"""
+	hi = _check_bounds(seq, lo, hi)
+	if lo == hi or not seq[lo] < item:
+		return lo
+	if seq[hi - 1] < item:
+		return hi
+	left, right = lo, hi - 1        # 不变式：seq[left] < item <= seq[right]，答案在(left, right]中
+	a, b = seq[left], seq[right]
+	bisect_next = False
+	while right - left > 1:
+		width = right - left
+		if bisect_next:
+			mid = (left + right) // 2
+		else:
+			mid = left + int((item - a) / (b - a) * width)
+			mid = min(max(mid, left + 1), right - 1)
+		v = seq[mid]
+		if v < item:
+			left, a = mid, v
+			guard = mid + isqrt(width)
+			if not bisect_next and guard < right:
+				v = seq[guard]
+				if v < item:
+					left, a = guard, v
+				else:
+					right, b = guard, v
+		else:
+			right, b = mid, v
+			guard = mid - isqrt(width)
+			if not bisect_next and guard > left:
+				v = seq[guard]
+				if v < item:
+					left, a = guard, v
+				else:
+					right, b = guard, v
+		bisect_next = (right - left) * 2 > width       # 缩小不足一半，下一轮二分
+	return right
+
+
+def exponential_search(seq, item, hint=0, lo=0, hi=None):
+	"""
+	指数（飞奔）查找：从hint出发以1, 2, 4, ...的步长向插入点方向探测，再在最后一段内二分
+	返回值同lower_bound；插入点与hint相距d时代价为O(log d)
+	"""
+	hi = _check_bounds(seq, lo, hi)
+	if not lo <= hint < hi:
+		hint = min(max(hint, lo), hi - 1) if lo < hi else lo
+	if hint == hi or seq[hint] < item:
+		return _gallop(seq, item, hint, hi)
+	end, step = hint, 1                     # 向左飞奔：不变式seq[end] >= item
+	while end > lo:
+		start = max(end - step, lo)
+		if seq[start] < item:
+			return lower_bound(seq, item, start + 1, end)
+		end, step = start, step << 1
+	return lo
+
+
+class _LazySeq:
+	"""按需从迭代器读取元素的序列视图，越过末尾时抛出IndexError"""
+
+	def __init__(self, iterable):
+		self._it = iter(iterable)
+		self._buf = []
+
+	def __getitem__(self, i):
+		buf = self._buf
+		while len(buf) <= i:
+			try:
+				buf.append(next(self._it))
+			except StopIteration:
+				raise IndexError("_LazySeq index out of range") from None
+		return buf[i]
+
+
+def unbounded_search(source, item):
+	"""
+	长度未知的有序序列上的指数查找，返回item的插入点（同lower_bound）
+	先以0, 1, 3, 7, ...探测直到遇到不小于item的元素或越过末尾，再在最后一段内二分，
+	越过末尾的位置视为正无穷。代价为O(log k)，k为插入点
+	:param source: 支持下标访问、越界时抛出IndexError的有序序列（如不断追加的日志），
+		或者有序的迭代器（只消费到插入点附近）
+	"""
+	seq = source if hasattr(source, '__getitem__') else _LazySeq(source)
+	lo, end, step = 0, 0, 1
+	while True:
+		try:
+			if not seq[end] < item:
+				break
+		except IndexError:
+			break
+		lo, end, step = end + 1, end + step, step << 1
+	hi = end
+	while lo < hi:
+		mid = (lo + hi) // 2
+		try:
+			below = seq[mid] < item
+		except IndexError:
+			below = False
+		if below:
+			lo = mid + 1
+		else:
+			hi = mid
+	return lo
+
+
+class StaticSearchIndex:
+	"""
+	只读静态查找索引：把有序序列重排成对缓存友好的布局
+		·'eytzinger'：按完全二叉树的层序（BFS）存放，节点k的子节点为2k、2k+1，
+		  前几层总在缓存中，每次探测的下一个位置都可以预先算出
+		·'btree'：按B树分块存放，每块block个键在内存中连续，块内二分，
+		  树高降为log(n) / log(block + 1)，每层只触及一块连续内存
+	整数/浮点键存放在紧凑的array中，查询结果为键在原有序序列中的下标
+	"""
+
+	def __init__(self, sorted_seq, layout='btree', block=64, typecode=None):
+		"""
+		:param sorted_seq: 升序序列
+		:param layout: 'btree'（默认）或'eytzinger'
+		:param block: B树布局每块的键数
+		:param typecode: 键数组的类型码，缺省时整数用'q'、浮点数用'd'，其他类型用list
+		"""
+		if layout not in ('eytzinger', 'btree'):
+			raise ValueError("in StaticSearchIndex(): unknown layout {!r}.".format(layout))
+		keys = list(sorted_seq)
+		n = self._n = len(keys)
+		self._layout = layout
+		if layout == 'eytzinger':
+			size = n + 1                        # 下标0不用
+		else:
+			self._block = block
+			self._nblocks = -(-n // block)
+			size = self._nblocks * block
+		self._pos = array('q', [n]) * size      # 布局位置 -> 有序下标，填充位为n
+		if layout == 'eytzinger':
+			tree = [keys[0] if keys else None] * size
+			self._build_eytzinger(keys, tree)
+		else:
+			tree = [keys[-1] if keys else None] * size     # 填充位放最大键，中序仍然非降
+			self._build_btree(keys, tree, 0, 0)
+		self._tree = self._compact(keys, tree, typecode)
+
+	@staticmethod
+	def _compact(keys, tree, typecode):
+		"""尽量把键放进紧凑的array"""
+		if typecode is None and keys:
+			types = set(map(type, keys))
+			typecode = 'q' if types == {int} else 'd' if types == {float} else None
+		if typecode is None:
+			return tree
+		try:
+			return array(typecode, tree)
+		except OverflowError:
+			return tree
+
+	def _build_eytzinger(self, keys, tree):
+		"""按中序遍历隐式完全二叉树，依次填入有序键"""
+		n, pos = self._n, self._pos
+		k, i, stack = 1, 0, []
+		while stack or k <= n:
+			while k <= n:
+				stack.append(k)
+				k *= 2
+			k = stack.pop()
+			tree[k], pos[k] = keys[i], i
+			i, k = i + 1, 2 * k + 1
+
+	def _build_btree(self, keys, tree, k, i):
+		"""按中序遍历隐式B树（块k的第j个子块为k·(block + 1) + j + 1），依次填入有序键，返回下一个键的下标"""
+		if k >= self._nblocks:
+			return i
+		b, pos = self._block, self._pos
+		for j in range(b):
+			i = self._build_btree(keys, tree, k * (b + 1) + j + 1, i)
+			if i < self._n:
+				tree[k * b + j], pos[k * b + j] = keys[i], i
+				i += 1
+		return self._build_btree(keys, tree, k * (b + 1) + b + 1, i)
+
+	def __len__(self):
+		return self._n
+
+	def _search(self, item, right):
+		tree, pos, n = self._tree, self._pos, self._n
+		if self._layout == 'eytzinger':
+			k = 1
+			if right:
+				while k <= n:
+					k = 2 * k + (not item < tree[k])
+			else:
+				while k <= n:
+					k = 2 * k + (tree[k] < item)
+			k >>= (~k & (k + 1)).bit_length()       # 去掉末尾连续的1以及其后的一个0，回到最后一次向左的节点
+			return pos[k] if k else n
+		b, nblocks = self._block, self._nblocks
+		find = bisect_right if right else bisect_left
+		k, res = 0, n
+		while k < nblocks:
+			base = k * b
+			j = find(tree, item, base, base + b) - base
+			if j < b:
+				res = pos[base + j]
+			k = k * (b + 1) + j + 1
+		return res
+
+	def lower_bound(self, item):
+		"""第一个不小于item的键在有序序列中的下标，不存在时返回len(self)"""
+		return self._search(item, False)
+
+	def upper_bound(self, item):
+		"""第一个大于item的键在有序序列中的下标，不存在时返回len(self)"""
+		return self._search(item, True)
+
+	def find(self, item):
+		"""item在有序序列中第一次出现的下标，不存在时返回-1"""
+		i = self._search(item, False)
+		if i < self._n and self.key_at(i) == item:
+			return i
+		return -1
+
+	def __contains__(self, item):
+		return self.find(item) >= 0
+
+	def key_at(self, i):
+		"""有序序列中下标为i的键"""
+		if not 0 <= i < self._n:
+			raise IndexError("in key_at(): index out of range.")
+		if self._layout == 'btree':
+			return self._tree[self._locate_btree(i)]
+		return self._tree[self._locate_eytzinger(i)]
+
+	def _locate_eytzinger(self, i):
+		"""有序下标i对应的Eytzinger位置：按中序下标二分下降"""
+		pos, k = self._pos, 1
+		while pos[k] != i:
+			k = 2 * k + (pos[k] < i)
+		return k
+
+	def _locate_btree(self, i):
+		"""有序下标i对应的B树布局位置"""
+		b, pos, k = self._block, self._pos, 0
+		while True:
+			base = k * b
+			j = bisect_left(pos, i, base, base + b) - base
+			if j < b and pos[base + j] == i:
+				return base + j
+			k = k * (b + 1) + j + 1
+
+
 if __name__ == '__main__':
 	a = [7, 19, 23, 34, 45, 51, 56, 59, 62, 81, 94]
 	print(a)
 	print(bi_search2(a, 7))
 	print(bi_search2(a, 45))
 	print(bi_search2(a, 50))
+	print(lower_bound(a, 45), upper_bound(a, 45), equal_range(a, 50), find(a, 62))
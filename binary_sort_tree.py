@@ -1,16 +1,23 @@
 """二叉排序树"""
 
-from obj import BinaryNode
+from obj import BinaryNode, subtree_size
 from dictionary import Assoc
 from queue_stack import Stack
 
 
 class DictBinTree:
-	"""二叉排序树（字典）类"""
+	"""
+	二叉排序树（字典）类
+		每个节点的size记录子树的节点个数，插入、删除时沿路径维护，
+		据此rank、select、count_range和按位置下标均为O(树高)
+	"""
 	
 	def __init__(self):
 		self._root = None
 	
+	def __len__(self):
+		return subtree_size(self._root)
+	
 	def is_empty(self):
 		return self._root is None
 	
@@ -31,21 +38,25 @@ class DictBinTree:
 		if bt is None:      # 空树
 			self._root = BinaryNode(Assoc(key, value))
 			return
+		path = []           # 插入成功时路径上各节点的size加1
 		while True:
+			path.append(bt)
 			entry = bt.elem
 			if key < entry.key:     # 左分支
 				if bt.left is None:
 					bt.left = BinaryNode(Assoc(key, value))
-					return
+					break
 				bt = bt.left
 			elif key > entry.key:       # 右分支
 				if bt.right is None:
 					bt.right = BinaryNode(Assoc(key, value))
-					return
+					break
 				bt = bt.right
 			else:                   # 替换已有值
 				bt.elem.value = value
 				return
+		for t in path:
+			t.size += 1
 	
 	def values(self):
 		"""字典迭代器，中序遍历和返回二叉排序树中的元素"""
@@ -58,17 +69,115 @@ class DictBinTree:
 			yield t.elem.key, t.elem.value
 			t = t.right
 
+	def items(self, lo=None, hi=None, reverse=False):
+		"""
+		区间迭代器：按key升序（reverse为True时降序）返回lo <= key < hi的(key, value)，lo、hi为None时不设界
+		下降时跳过整棵落在区间外的子树，代价O(树高 + 返回的元素个数)
+		"""
+		t, s = self._root, Stack()
+		if not reverse:
+			while t is not None:        # 栈中保留key >= lo的祖先
+				if lo is not None and t.elem.key < lo:
+					t = t.right
+				else:
+					s.push(t)
+					t = t.left
+			while not s.is_empty():
+				t = s.pop()
+				if hi is not None and not t.elem.key < hi:
+					return
+				yield t.elem.key, t.elem.value
+				t = t.right
+				while t is not None:
+					s.push(t)
+					t = t.left
+		else:
+			while t is not None:        # 栈中保留key < hi的祖先
+				if hi is not None and not t.elem.key < hi:
+					t = t.left
+				else:
+					s.push(t)
+					t = t.right
+			while not s.is_empty():
+				t = s.pop()
+				if lo is not None and t.elem.key < lo:
+					return
+				yield t.elem.key, t.elem.value
+				t = t.left
+				while t is not None:
+					s.push(t)
+					t = t.right
+	
+	def __reversed__(self):
+		return self.items(reverse=True)
+	
+	def _bound(self, key, below, strict):
+		"""
+		下降一次找最接近key的元素
+		:param below: True时找不大于（strict时小于）key的最大元素，否则找不小于（strict时大于）key的最小元素
+		:return: (key, value)，不存在时为None
+		"""
+		t, res = self._root, None
+		while t is not None:
+			k = t.elem.key
+			if k == key and not strict:
+				return k, t.elem.value
+			if (k < key) if below else (key < k):       # t在要找的一侧，记下后向key靠近
+				res = t
+				t = t.right if below else t.left
+			else:
+				t = t.left if below else t.right
+		return (res.elem.key, res.elem.value) if res is not None else None
+	
+	def floor(self, key):
+		"""不大于key的最大元素(key, value)，不存在时为None"""
+		return self._bound(key, True, False)
+	
+	def ceiling(self, key):
+		"""不小于key的最小元素(key, value)，不存在时为None"""
+		return self._bound(key, False, False)
+	
+	def predecessor(self, key):
+		"""小于key的最大元素(key, value)，不存在时为None"""
+		return self._bound(key, True, True)
+	
+	def successor(self, key):
+		"""大于key的最小元素(key, value)，不存在时为None"""
+		return self._bound(key, False, True)
+	
+	def min(self):
+		"""最小元素(key, value)，空树为None"""
+		t = self._root
+		if t is None:
+			return None
+		while t.left is not None:
+			t = t.left
+		return t.elem.key, t.elem.value
+	
+	def max(self):
+		"""最大元素(key, value)，空树为None"""
+		t = self._root
+		if t is None:
+			return None
+		while t.right is not None:
+			t = t.right
+		return t.elem.key, t.elem.value
+	
 	def delete(self, key):
 		p, q = None, self._root     # 维持p为q的父节点
+		path = []                   # q的祖先
 		
 		while q is not None and q.elem.key != key:
 			p = q
+			path.append(p)
 			if key < q.elem.key:
 				q = q.left
 			else:
 				q = q.right
 		if q is None:   # 树中不存在关键码key
 			return
+		for t in path:
+			t.size -= 1
 		
 		# 到此处，q指向的是要删除的节点，p是其父节点
 		if q.left is None:      # 如果q没有左子节点
@@ -81,9 +190,11 @@ class DictBinTree:
 			return
 		
 		# 如果q有左子节点
-		r = q.left      # 找左子树的最右节点
+		r, extra = q.left, subtree_size(q.right)     # 找左子树的最右节点，沿途子树都接入q的右子树
+		r.size += extra
 		while r.right is not None:
 			r = r.right
+			r.size += extra
 		r.right = q.right
 		if p is None:   # q指向根节点
 			self._root = q.left     # 修改_root
@@ -92,6 +203,85 @@ class DictBinTree:
 		else:
 			p.right = q.left
 	
+	def rank(self, key):
+		"""小于key的键的个数"""
+		t, r = self._root, 0
+		while t is not None:
+			if key <= t.elem.key:
+				t = t.left
+			else:
+				r += subtree_size(t.left) + 1
+				t = t.right
+		return r
+	
+	def _select_node(self, pos):
+		t = self._root
+		while True:
+			k = subtree_size(t.left)
+			if pos < k:
+				t = t.left
+			elif pos > k:
+				pos -= k + 1
+				t = t.right
+			else:
+				return t
+	
+	def select(self, pos):
+		"""返回按key升序第pos个(key, value)，支持负数下标"""
+		n = len(self)
+		if pos < 0:
+			pos += n
+		if not 0 <= pos < n:
+			raise IndexError("in select(): index out of range.")
+		t = self._select_node(pos)
+		return t.elem.key, t.elem.value
+	
+	def count_range(self, lo=None, hi=None):
+		"""lo <= key < hi的键的个数，lo、hi为None时不设界"""
+		r = len(self) if hi is None else self.rank(hi)
+		return max(0, r - (0 if lo is None else self.rank(lo)))
+	
+	def _values_from(self, pos):
+		"""从按key升序第pos个元素开始中序遍历：先下降到该节点，栈中保留向左走过的祖先"""
+		t, s = self._root, Stack()
+		while t is not None:
+			k = subtree_size(t.left)
+			if pos <= k:
+				s.push(t)
+				t = t.left
+			else:
+				pos -= k + 1
+				t = t.right
+		while not s.is_empty():
+			t = s.pop()
+			yield t.elem.key, t.elem.value
+			t = t.right
+			while t is not None:
+				s.push(t)
+				t = t.left
+	
+	def __getitem__(self, index):
+		"""按位置下标取(key, value)；切片返回列表，步长为1时为O(树高 + 切片长度)"""
+		if not isinstance(index, slice):
+			return self.select(index)
+		start, stop, step = index.indices(len(self))
+		if step != 1:
+			return [self.select(i) for i in range(start, stop, step)]
+		res = []
+		for item in self._values_from(start):
+			if len(res) >= stop - start:
+				break
+			res.append(item)
+		return res
+	
+	def height(self):
+		"""树的高度（空树为0），逐层遍历，不受递归深度限制"""
+		level, h = [self._root] if self._root is not None else [], 0
+		while level:
+			h += 1
+			level = [c for t in level for c in (t.left, t.right) if c is not None]
+		return h
+
 	def print(self):
 		for k, v in self.values():
 			print(k, v)
@@ -0,0 +1,272 @@
+"""
+缓存模块
+
+	散列索引（DictHash：key -> CacheNode）+ 双向链表（DuplexLinkList），get / put均为O(1)
+	淘汰策略：
+		·LRUCache：链表按最近访问排序，淘汰表头（最久未访问）的条目
+		·LFUCache：按访问次数分桶，桶本身也串成按次数升序的双向链表，桶内按最近访问排序，
+		  淘汰第一个桶的表头，访问时条目移入相邻的下一个桶，均为O(1)
+		·TTLCache：条目写入后经过ttl秒过期，链表按过期时间排序，超出容量时淘汰最早过期的条目
+	容量可以按条目个数（maxsize）和/或按权重（maxweight，权重由weigher(key, value)给出）限制，
+	命中、未命中、淘汰、过期次数记录在hits、misses、evictions、expirations中
+
+	memoize装饰器用上述缓存记忆函数的返回值
+"""
+
+import time
+from functools import wraps
+
+from dictionary import DictHash
+from link_list import DuplexLinkList
+from obj import CacheNode, FreqNode
+
+
+class LRUCache:
+	"""最近最少使用（LRU）淘汰的缓存"""
+
+	def __init__(self, maxsize=128, maxweight=None, weigher=None):
+		"""
+		:param maxsize: 最多容纳的条目个数，None表示不限
+		:param maxweight: 最大总权重，None表示不限
+		:param weigher: 权重函数weigher(key, value)，默认每个条目权重为1
+		"""
+		self.maxsize = maxsize
+		self.maxweight = maxweight
+		self._weigher = weigher
+		self._index = DictHash()
+		self._weight = 0
+		self.hits = self.misses = self.evictions = self.expirations = 0
+		self._init_order()
+
+	# 以下为淘汰策略相关的操作，由子类覆盖
+
+	def _init_order(self):
+		self._order = DuplexLinkList()
+
+	def _link(self, node):
+		"""新条目加入"""
+		self._order.append_node(node)
+
+	def _touch(self, node):
+		"""条目被读取"""
+		self._order.move_to_end(node)
+
+	def _refresh(self, node):
+		"""已有条目被重新写入"""
+		self._touch(node)
+
+	def _unlink(self, node):
+		"""条目被移除"""
+		self._order.unlink(node)
+
+	def _victim(self):
+		"""下一个被淘汰的条目"""
+		return self._order.first_node()
+
+	def _alive(self, node):
+		"""条目是否仍然有效"""
+		return True
+
+	# 公共接口
+
+	def __len__(self):
+		return len(self._index)
+
+	def __contains__(self, key):
+		node = self._index.search(key)
+		return node is not None and self._alive(node)
+
+	def get(self, key, default=None):
+		"""读取key对应的值，不存在或已过期时返回default"""
+		node = self._index.search(key)
+		if node is not None and not self._alive(node):
+			self._remove(node)
+			self.expirations += 1
+			node = None
+		if node is None:
+			self.misses += 1
+			return default
+		self.hits += 1
+		self._touch(node)
+		return node.elem
+
+	def put(self, key, value):
+		"""写入key和value，超出容量时按策略淘汰"""
+		weight = 1 if self._weigher is None else self._weigher(key, value)
+		node = self._index.search(key)
+		if self.maxweight is not None and weight > self.maxweight:     # 单个条目就超过容量，不缓存，也不淘汰其他条目
+			if node is not None:
+				self._remove(node)      # 旧值已过时
+			return
+		if node is not None:
+			self._weight += weight - node.weight
+			node.elem, node.weight = value, weight
+			self._refresh(node)
+		else:
+			while len(self) and (self.maxsize is not None and len(self) >= self.maxsize or
+					self.maxweight is not None and self._weight + weight > self.maxweight):
+				self._evict()       # 先腾出空间，新条目不会被立即淘汰
+			node = CacheNode(key, value, weight)
+			self._index.insert(key, node)
+			self._link(node)
+			self._weight += weight
+		while len(self) and (self.maxsize is not None and len(self) > self.maxsize or
+				self.maxweight is not None and self._weight > self.maxweight):
+			self._evict()           # 更新已有条目使总权重增大时，淘汰其他条目
+
+	def delete(self, key):
+		node = self._index.search(key)
+		if node is not None:
+			self._remove(node)
+
+	def clear(self):
+		self._index = DictHash()
+		self._weight = 0
+		self._init_order()
+
+	def _remove(self, node):
+		self._unlink(node)
+		self._index.delete(node.key)
+		self._weight -= node.weight
+
+	def _evict(self):
+		self._remove(self._victim())
+		self.evictions += 1
+
+	def weight(self):
+		"""当前总权重"""
+		return self._weight
+
+	def stats(self):
+		"""统计信息"""
+		return {
+			'hits': self.hits, 'misses': self.misses,
+			'evictions': self.evictions, 'expirations': self.expirations,
+			'size': len(self), 'weight': self._weight,
+		}
+
+
+class LFUCache(LRUCache):
+	"""最不经常使用（LFU）淘汰的缓存，访问次数相同时淘汰最久未访问的条目"""
+
+	def _init_order(self):
+		self._buckets = DuplexLinkList()    # FreqNode链表，按访问次数升序
+
+	def _link(self, node):
+		first = self._buckets.first_node()
+		if first is None or first.freq != 1:
+			first = FreqNode(1, DuplexLinkList())
+			self._buckets.insert_node_after(None, first)
+		node.bucket = first
+		first.elem.append_node(node)
+
+	def _touch(self, node):
+		bucket = node.bucket
+		nxt = bucket.next
+		if nxt is None or nxt.freq != bucket.freq + 1:      # 下一个桶不存在则新建
+			nxt = FreqNode(bucket.freq + 1, DuplexLinkList())
+			self._buckets.insert_node_after(bucket, nxt)
+		bucket.elem.unlink(node)
+		nxt.elem.append_node(node)
+		node.bucket = nxt
+		if bucket.elem.is_empty():
+			self._buckets.unlink(bucket)
+
+	def _unlink(self, node):
+		bucket = node.bucket
+		bucket.elem.unlink(node)
+		node.bucket = None
+		if bucket.elem.is_empty():
+			self._buckets.unlink(bucket)
+
+	def _victim(self):
+		return self._buckets.first_node().elem.first_node()
+
+
+class TTLCache(LRUCache):
+	"""条目写入ttl秒后过期的缓存，超出容量时淘汰最早过期的条目"""
+
+	def __init__(self, maxsize=128, ttl=60.0, maxweight=None, weigher=None, timer=time.monotonic):
+		"""
+		:param ttl: 存活时间（秒）
+		:param timer: 计时函数
+		其余参数同LRUCache
+		"""
+		self.ttl = ttl
+		self._timer = timer
+		super(TTLCache, self).__init__(maxsize, maxweight, weigher)
+
+	def _link(self, node):
+		node.expire = self._timer() + self.ttl
+		self._order.append_node(node)
+
+	def _touch(self, node):
+		pass        # 读取不延长寿命，链表始终按过期时间排序
+
+	def _refresh(self, node):
+		node.expire = self._timer() + self.ttl
+		self._order.move_to_end(node)
+
+	def _alive(self, node):
+		return node.expire > self._timer()
+
+	def put(self, key, value):
+		self.purge()
+		super(TTLCache, self).put(key, value)
+
+	def purge(self):
+		"""清除所有已过期的条目：从表头开始，遇到未过期的条目即停止"""
+		now, node = self._timer(), self._order.first_node()
+		while node is not None and node.expire <= now:
+			self._remove(node)
+			self.expirations += 1
+			node = self._order.first_node()
+
+
+POLICIES = {
+	'lru': LRUCache,
+	'lfu': LFUCache,
+	'ttl': TTLCache,
+}
+
+_MISSING = object()
+_KWMARK = object()      # 分隔位置参数与关键字参数
+
+
+def memoize(maxsize=128, policy='lru', **kwargs):
+	"""
+	记忆化装饰器：以调用参数为key缓存函数返回值，参数须可散列
+	:param maxsize: 最多缓存的结果个数
+	:param policy: 'lru'、'lfu'或'ttl'
+	:param kwargs: 传给缓存类的其他参数，如ttl、maxweight、weigher
+	被装饰的函数带有cache属性，可查看统计信息或清空
+	"""
+	def decorator(func):
+		cache = POLICIES[policy](maxsize=maxsize, **kwargs)
+
+		@wraps(func)
+		def wrapper(*args, **kw):
+			key = args + (_KWMARK,) + tuple(kw.items()) if kw else args
+			value = cache.get(key, _MISSING)
+			if value is _MISSING:
+				value = func(*args, **kw)
+				cache.put(key, value)
+			return value
+
+		wrapper.cache = cache
+		return wrapper
+	return decorator
+
+
+if __name__ == '__main__':
+	c = LFUCache(maxsize=2)
+	c.put('a', 1)
+	c.put('b', 2)
+	c.get('a')
+	c.put('c', 3)       # 淘汰访问次数最少的'b'
+	print('b' in c, c.get('a'), c.get('c'), c.stats())
+
+	@memoize(maxsize=64)
+	def fib(n):
+		return n if n < 2 else fib(n - 1) + fib(n - 2)
+	print(fib(80), fib.cache.stats())
@@ -0,0 +1,136 @@
+"""
+字典引擎基准测试
+
+	对dictionary.py、binary_sort_tree.py、balance_binary_sort_tree.py、b_tree.py中的各字典引擎，
+	在以下三种负载下测量总耗时和单次操作的平均纳秒数：
+		·insert：向空字典插入n个随机key
+		·read：预先插入n个key（不计时），再执行n次操作，其中95%为search、5%为insert
+		·mixed：预先插入n个key（不计时），再执行n次操作，search、insert、delete各占1/3
+	每个条目结束后用values()与内置dict的结果核对，ok为False表示结果不正确
+	O(n)插入的引擎只测到各自的最大规模
+
+	用法：
+		python dict_benchmark.py --sizes 1e4,1e5,1e6 --out dict_bench.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from random import Random
+
+from b_tree import DictBTree
+from balance_binary_sort_tree import DictAVL, DictRBTree
+from binary_sort_tree import DictBinTree
+from dictionary import DictChunkList, DictHash, DictList, DictOrdArray, DictOrdList, DictSkipList
+
+# 名称 -> (构造函数, 最大规模)
+ENGINES = {
+	'DictList': (DictList, 10 ** 4),
+	'DictOrdList': (DictOrdList, 10 ** 5),
+	'DictOrdArray': (DictOrdArray, 10 ** 5),
+	'DictChunkList': (DictChunkList, None),
+	'DictHash': (DictHash, None),
+	'DictBinTree': (DictBinTree, None),
+	'DictAVL': (DictAVL, None),
+	'DictRBTree': (DictRBTree, None),
+	'DictSkipList': (DictSkipList, None),
+	'DictBTree': (DictBTree, None),
+}
+
+_SEARCH, _INSERT, _DELETE = 0, 1, 2
+
+
+def _ops(workload, n, rng):
+	"""
+	生成负载
+	:return: (预先插入的key列表, 计时部分的(操作, key)列表)
+	"""
+	space = n * 4
+	if workload == 'insert':
+		return [], [(_INSERT, rng.randrange(space)) for _ in range(n)]
+	preload = [rng.randrange(space) for _ in range(n)]
+	if workload == 'read':
+		ops = [(_INSERT if rng.random() < 0.05 else _SEARCH, rng.randrange(space)) for _ in range(n)]
+	else:
+		ops = [(rng.randrange(3), rng.randrange(space)) for _ in range(n)]
+	return preload, ops
+
+
+WORKLOADS = ('insert', 'read', 'mixed')
+
+
+def run_case(name, workload, n, seed=0):
+	"""
+	运行一个测试条目
+	:return: 结果字典
+	"""
+	preload, ops = _ops(workload, n, Random(seed))
+	d, ref = ENGINES[name][0](), {}
+	for k in preload:
+		d.insert(k, k)
+		ref[k] = k
+
+	search, insert, delete = d.search, d.insert, d.delete
+	start = time.perf_counter()
+	for op, k in ops:
+		if op == _SEARCH:
+			search(k)
+		elif op == _INSERT:
+			insert(k, op)
+		else:
+			delete(k)
+	seconds = time.perf_counter() - start
+
+	for op, k in ops:
+		if op == _INSERT:
+			ref[k] = op
+		elif op == _DELETE:
+			ref.pop(k, None)
+	ok = sorted(d.values()) == sorted(ref.items())
+	return {'engine': name, 'workload': workload, 'n': n, 'seconds': seconds,
+			'ns_per_op': seconds / max(len(ops), 1) * 1e9, 'ok': ok}
+
+
+def run_suite(sizes, engines=None, workloads=None, seed=0, log=None):
+	"""运行全部条目，超过引擎最大规模的条目跳过"""
+	results = []
+	for name in engines or ENGINES:
+		max_n = ENGINES[name][1]
+		for workload in workloads or WORKLOADS:
+			for n in sizes:
+				if max_n is not None and n > max_n:
+					continue
+				record = run_case(name, workload, n, seed)
+				results.append(record)
+				if log is not None:
+					log(record)
+	return results
+
+
+def _format(record):
+	return "{engine:>14} {workload:>7} n={n:<8} {seconds:9.3f}s {ns_per_op:9.0f}ns/op".format(**record) + \
+		("" if record['ok'] else " WRONG")
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="dictionary engine benchmark")
+	parser.add_argument('--sizes', default='1e4,1e5,1e6')
+	parser.add_argument('--engines', default=','.join(ENGINES))
+	parser.add_argument('--workloads', default=','.join(WORKLOADS))
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--out', help="write results as JSON")
+	args = parser.parse_args(argv)
+
+	results = run_suite(
+		[int(float(s)) for s in args.sizes.split(',')],
+		args.engines.split(','), args.workloads.split(','), args.seed,
+		log=lambda r: print(_format(r), flush=True))
+	if args.out:
+		with open(args.out, 'w') as f:
+			json.dump(results, f, indent=1)
+	return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+	sys.exit(main())
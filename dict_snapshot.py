@@ -0,0 +1,264 @@
+"""
+字典快照：把有序字典保存为只读文件，用mmap打开后直接在映射的字节上二分查找
+
+	文件布局（各段按8字节对齐）：
+		·文件头：魔数、版本、key类型、字节序、元素个数n、key堆长度、value堆长度
+		·key表：int型key为n个定长的int64；str / bytes型key为n + 1个int64偏移量，后接key堆
+		  （str按UTF-8编码，UTF-8字节序与码点序一致，因此可以直接比较字节串）
+		·value表：n + 1个int64偏移量，后接value堆（每个value单独pickle）
+	打开快照只需映射文件和解析文件头，为O(1)；查找为O(log n)次key比较加一次反序列化，
+	只有被访问到的页才会读入内存，多个进程打开同一快照时共享操作系统的页缓存
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+
+from exception import SnapshotError
+
+_MAGIC = b'DSNP'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBBxqqq')      # 魔数, 版本, key类型, 字节序, n, key堆长度, value堆长度
+_INT, _STR, _BYTES = 0, 1, 2
+_ORDER = 0 if sys.byteorder == 'little' else 1
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _key_kind(key):
+	if isinstance(key, int):
+		return _INT
+	if isinstance(key, str):
+		return _STR
+	if isinstance(key, (bytes, bytearray)):
+		return _BYTES
+	raise SnapshotError("unsupported key type: {}".format(type(key).__name__))
+
+
+def _pad(f, size):
+	"""补零到8字节对齐"""
+	if size % 8:
+		f.write(b'\0' * (8 - size % 8))
+
+
+def save(path, source):
+	"""
+	保存快照
+	:param path: 文件路径，先写入临时文件再替换，不会留下写了一半的快照
+	:param source: 提供values()迭代器（返回(key, value)）的字典对象、内置dict或(key, value)的可迭代对象；
+		key须同为int（int64范围内）、同为str或同为bytes，重复的key保留最后一个
+	:return: 元素个数
+	"""
+	if isinstance(source, dict):
+		items = source.items()
+	elif hasattr(source, 'values'):
+		items = source.values()
+	else:
+		items = source
+	batch = sorted(items, key=itemgetter(0))
+	pairs = [batch[j] for j in range(len(batch)) if j + 1 == len(batch) or batch[j + 1][0] != batch[j][0]]
+	n = len(pairs)
+
+	kind = _key_kind(pairs[0][0]) if pairs else _INT
+	for key, _ in pairs:
+		if _key_kind(key) != kind:
+			raise SnapshotError("keys of mixed types")
+	if kind == _INT:
+		if pairs and not (_INT64_MIN <= pairs[0][0] and pairs[-1][0] <= _INT64_MAX):
+			raise SnapshotError("int key out of int64 range")
+		keys, key_heap = array('q', [key for key, _ in pairs]), b''
+	else:
+		encoded = [key.encode('utf-8') if kind == _STR else bytes(key) for key, _ in pairs]
+		keys, off = array('q', [0]), 0
+		for k in encoded:
+			off += len(k)
+			keys.append(off)
+		key_heap = b''.join(encoded)
+
+	values, voff = [], array('q', [0])
+	for _, value in pairs:
+		values.append(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+		voff.append(voff[-1] + len(values[-1]))
+
+	tmp = path + '.tmp'
+	with open(tmp, 'wb') as f:
+		f.write(_HEADER.pack(_MAGIC, _VERSION, kind, _ORDER, n, len(key_heap), voff[-1]))
+		keys.tofile(f)
+		f.write(key_heap)
+		_pad(f, len(key_heap))
+		voff.tofile(f)
+		for v in values:
+			f.write(v)
+	os.replace(tmp, path)
+	return n
+
+
+def load(path):
+	"""打开快照"""
+	return DictSnapshot(path)
+
+
+class _KeyView:
+	"""str / bytes型key表的序列视图，供bisect使用，元素为映射中的字节串"""
+
+	def __init__(self, mm, base, offsets):
+		self._mm, self._base, self._off = mm, base, offsets
+
+	def __len__(self):
+		return len(self._off) - 1
+
+	def __getitem__(self, i):
+		base, off = self._base, self._off
+		return self._mm[base + off[i]:base + off[i + 1]]
+
+
+class DictSnapshot:
+	"""
+	只读的快照字典，接口与DictOrdList一致（search / values / range / items_from），不支持insert、delete
+	可以用with语句打开，退出时关闭映射；可以被pickle，在子进程中按路径重新打开
+	"""
+
+	def __init__(self, path):
+		self._path = path
+		self._file = open(path, 'rb')
+		try:
+			self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:      # 空文件无法映射
+			self._file.close()
+			raise SnapshotError("not a dictionary snapshot: {}".format(path))
+		if len(self._mm) < _HEADER.size:
+			self.close()
+			raise SnapshotError("not a dictionary snapshot: {}".format(path))
+		magic, version, kind, order, n, key_len, val_len = _HEADER.unpack_from(self._mm)
+		if magic != _MAGIC or version != _VERSION or kind not in (_INT, _STR, _BYTES):
+			self.close()
+			raise SnapshotError("not a dictionary snapshot: {}".format(path))
+		if order != _ORDER:
+			self.close()
+			raise SnapshotError("snapshot was written on a machine with different byte order")
+
+		self._kind, self._n = kind, n
+		self._buf = memoryview(self._mm)
+		pos = _HEADER.size
+		if kind == _INT:
+			self._koff = None
+			self._keys = self._buf[pos:pos + 8 * n].cast('q')      # 直接在int64数组上二分
+			pos += 8 * n
+		else:
+			self._koff = self._buf[pos:pos + 8 * (n + 1)].cast('q')
+			pos += 8 * (n + 1)
+			self._keys = _KeyView(self._mm, pos, self._koff)
+			pos += key_len + (-key_len) % 8
+		self._voff = self._buf[pos:pos + 8 * (n + 1)].cast('q')
+		self._vbase = pos + 8 * (n + 1)
+		if self._vbase + val_len > len(self._mm):
+			self.close()
+			raise SnapshotError("truncated snapshot: {}".format(path))
+
+	def close(self):
+		"""关闭映射，须先释放所有指向映射的memoryview"""
+		for name in ('_keys', '_koff', '_voff', '_buf'):
+			view = self.__dict__.pop(name, None)
+			if isinstance(view, memoryview):
+				view.release()
+		if getattr(self, '_mm', None) is not None:
+			self._mm.close()
+			self._mm = None
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __reduce__(self):
+		return DictSnapshot, (self._path,)
+
+	def __len__(self):
+		return self._n
+
+	def __contains__(self, key):
+		return self._find(key) >= 0
+
+	def __str__(self):
+		return "{" + ", ".join(["{0}: {1}".format(k, v) for k, v in self.values()]) + "}"
+
+	def is_empty(self):
+		return self._n == 0
+
+	def _encode(self, key):
+		"""把查询的key转换为key表中的表示，类型不符时抛出TypeError"""
+		if self._kind == _INT:
+			if not isinstance(key, int):
+				raise TypeError("snapshot keys are int, got {}".format(type(key).__name__))
+			return key
+		if self._kind == _STR:
+			if not isinstance(key, str):
+				raise TypeError("snapshot keys are str, got {}".format(type(key).__name__))
+			return key.encode('utf-8')
+		if not isinstance(key, (bytes, bytearray)):
+			raise TypeError("snapshot keys are bytes, got {}".format(type(key).__name__))
+		return bytes(key)
+
+	def _index(self, key):
+		"""第一个不小于key的元素的下标"""
+		k = self._encode(key)
+		if self._kind == _INT and not _INT64_MIN <= k <= _INT64_MAX:
+			return 0 if k < 0 else self._n
+		return bisect_left(self._keys, k)
+
+	def _find(self, key):
+		k = self._encode(key)
+		if self._kind == _INT and not _INT64_MIN <= k <= _INT64_MAX:
+			return -1
+		i = bisect_left(self._keys, k)
+		return i if i < self._n and self._keys[i] == k else -1
+
+	def key_at(self, i):
+		k = self._keys[i]
+		if self._kind == _STR:
+			return k.decode('utf-8')
+		return k
+
+	def value_at(self, i):
+		voff, base = self._voff, self._vbase
+		return pickle.loads(self._mm[base + voff[i]:base + voff[i + 1]])
+
+	def search(self, key):
+		i = self._find(key)
+		return self.value_at(i) if i >= 0 else None
+
+	def values(self):
+		"""字典迭代器，按key升序返回(key, value)"""
+		return self.range()
+
+	def range(self, lo=None, hi=None):
+		"""区间迭代器：按key升序返回lo <= key < hi的(key, value)，lo、hi为None时不设界"""
+		i = 0 if lo is None else self._index(lo)
+		end = self._n if hi is None else self._index(hi)
+		while i < end:
+			yield self.key_at(i), self.value_at(i)
+			i += 1
+
+	def items_from(self, key):
+		"""从第一个不小于key的元素开始，按key升序返回(key, value)"""
+		return self.range(key)
+
+
+if __name__ == '__main__':
+	import tempfile
+	from dictionary import DictOrdList
+	d = DictOrdList()
+	d.bulk_insert((i * 3, str(i)) for i in range(10))
+	snapshot_path = os.path.join(tempfile.gettempdir(), 'dict_snapshot_demo.dsnp')
+	print(save(snapshot_path, d))
+	with load(snapshot_path) as s:
+		print(s)
+		print(s.search(9), s.search(10), 27 in s)
+		print(list(s.range(5, 20)))
+	os.remove(snapshot_path)
@@ -1,5 +1,12 @@
 """字典"""
 
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from random import Random
+
+from obj import SkipNode
+
 
 class Assoc:
 	"""映射关系描述类"""
@@ -52,6 +59,11 @@ class DictList:
 			if assoc.value == value:
 				self._elems.pop(i)
 
+	def values(self):
+		"""字典迭代器，返回(key, value)"""
+		for assoc in self._elems:
+			yield assoc.key, assoc.value
+
 
 class DictOrdList(DictList):
 	"""加持有序列表和二分搜索"""
@@ -70,6 +82,17 @@ class DictOrdList(DictList):
 			else:
 				low = mid + 1           # 在高半区继续
 
+	def _index(self, key, low=0):
+		"""返回下标low之后第一个key不小于给定key的元素的下标"""
+		elems, high = self._elems, len(self._elems)
+		while low < high:
+			mid = low + (high - low) // 2
+			if elems[mid].key < key:
+				low = mid + 1
+			else:
+				high = mid
+		return low
+
 	def search(self, key):
 		res = self.bisearch(key)
 		return res.value if res else None
@@ -82,7 +105,7 @@ class DictOrdList(DictList):
 		while low <= high:
 			mid = low + (high - low) // 2
 			if key == self._elems[mid].key:
-				self._elems[key].value = value
+				self._elems[mid].value = value
 				return
 			if key <= self._elems[mid].key:
 				high = mid - 1
@@ -92,9 +115,534 @@ class DictOrdList(DictList):
 		self._elems.insert(low, Assoc(key, value))
 
 	def delete(self, key):
-		assoc = self.bisearch(key)
-		if assoc is not None:
-			self._elems.remove(assoc)
+		i = self._index(key)
+		if i < len(self._elems) and self._elems[i].key == key:
+			self._elems.pop(i)
+
+	def bulk_insert(self, items):
+		"""
+		批量插入
+			·批内元素按key稳定排序，重复的key保留最后一个
+			·与已有的有序表一趟合并：每个批内元素从上一个位置起二分定位，其间的已有元素整段复制
+			·总代价O(n + m log m + m log n)，而逐个insert为O(n·m)
+		:param items: (key, value)的可迭代对象
+		:return: None
+		"""
+		batch = sorted(items, key=itemgetter(0))
+		elems, res, i, m = self._elems, [], 0, len(batch)
+		for j, (key, value) in enumerate(batch):
+			if j + 1 < m and batch[j + 1][0] == key:   # 后面还有相同的key
+				continue
+			p = self._index(key, i)
+			res += elems[i:p]
+			if p < len(elems) and elems[p].key == key:     # 覆盖原来的value
+				elems[p].value = value
+				res.append(elems[p])
+				i = p + 1
+			else:
+				res.append(Assoc(key, value))
+				i = p
+		res += elems[i:]
+		self._elems = res
+
+	def range(self, lo=None, hi=None):
+		"""区间迭代器：二分定位起点，按key升序返回lo <= key < hi的(key, value)，lo、hi为None时不设界"""
+		elems = self._elems
+		i = 0 if lo is None else self._index(lo)
+		while i < len(elems):
+			assoc = elems[i]
+			if hi is not None and not assoc.key < hi:
+				return
+			yield assoc.key, assoc.value
+			i += 1
+
+	def items_from(self, key):
+		"""从第一个不小于key的元素开始，按key升序返回(key, value)"""
+		return self.range(key)
+
+
+class DictOrdArray:
+	"""
+	结构数组（SoA）形式的有序字典，接口与DictOrdList相同
+		·键、值分别存放在两个平行数组中，不再为每个元素创建Assoc对象
+		·指定typecode时键存放在紧凑的array中（如整数键'q'、浮点键'd'），每个键只占8字节；
+		  指定value_typecode时值也存放在array中
+		·查找直接在键数组上用bisect二分，探测时没有属性访问
+	"""
+
+	def __init__(self, typecode=None, value_typecode=None):
+		self._typecode = typecode
+		self._value_typecode = value_typecode
+		self._keys, self._values = self._new_keys(), self._new_values()
+
+	def _new_keys(self):
+		return array(self._typecode) if self._typecode else []
+
+	def _new_values(self):
+		return array(self._value_typecode) if self._value_typecode else []
+
+	def __len__(self):
+		return len(self._keys)
+
+	def __str__(self):
+		return "{" + ", ".join(["{0}: {1}".format(k, v) for k, v in self.values()]) + "}"
+
+	def is_empty(self):
+		return not self._keys
+
+	def _index(self, key, low=0):
+		"""返回下标low之后第一个不小于key的键的下标"""
+		return bisect_left(self._keys, key, low)
+
+	def bisearch(self, key):
+		i = self._index(key)
+		if i < len(self._keys) and self._keys[i] == key:
+			return Assoc(key, self._values[i])
+
+	def search(self, key):
+		i = self._index(key)
+		if i < len(self._keys) and self._keys[i] == key:
+			return self._values[i]
+
+	def insert(self, key, value):
+		i = self._index(key)
+		if i < len(self._keys) and self._keys[i] == key:     # 覆盖原来的value
+			self._values[i] = value
+			return
+		self._keys.insert(i, key)
+		self._values.insert(i, value)
+
+	def delete(self, key):
+		i = self._index(key)
+		if i < len(self._keys) and self._keys[i] == key:
+			del self._keys[i]
+			del self._values[i]
+
+	def delete_by_value(self, value):
+		for i, v in enumerate(self._values):
+			if v == value:
+				del self._keys[i]
+				del self._values[i]
+				return
+
+	def values(self):
+		"""字典迭代器，按key升序返回(key, value)"""
+		return zip(self._keys, self._values)
+
+	def bulk_insert(self, items):
+		"""批量插入，做法同DictOrdList.bulk_insert，整段复制在两个平行数组上进行"""
+		batch = sorted(items, key=itemgetter(0))
+		keys, values, i, m = self._keys, self._values, 0, len(batch)
+		res_keys, res_values = self._new_keys(), self._new_values()
+		for j, (key, value) in enumerate(batch):
+			if j + 1 < m and batch[j + 1][0] == key:   # 后面还有相同的key
+				continue
+			p = self._index(key, i)
+			res_keys += keys[i:p]
+			res_values += values[i:p]
+			res_keys.append(key)
+			res_values.append(value)
+			i = p + 1 if p < len(keys) and keys[p] == key else p
+		res_keys += keys[i:]
+		res_values += values[i:]
+		self._keys, self._values = res_keys, res_values
+
+	def range(self, lo=None, hi=None):
+		"""区间迭代器：二分定位两端，按key升序返回lo <= key < hi的(key, value)，lo、hi为None时不设界"""
+		keys, values = self._keys, self._values
+		i = 0 if lo is None else self._index(lo)
+		j = len(keys) if hi is None else self._index(hi, i)
+		for k in range(i, j):
+			yield keys[k], values[k]
+
+	def items_from(self, key):
+		"""从第一个不小于key的元素开始，按key升序返回(key, value)"""
+		return self.range(key)
+
+
+class DictChunkList:
+	"""
+	分块有序表（B+-list）实现的有序字典，适合千万级的键
+		·键、值分别切成若干有序块（每块不超过2·load个），另有各块最大键组成的_maxes
+		·查找：在_maxes上二分定位块，再在块内二分，均为O(log n)
+		·插入/删除只移动一个块内的元素；块过大时对半分裂，过小时与相邻块合并
+		·位置索引：对各块长度维护树状数组（Fenwick树），rank / select为O(log n)，
+		  块的分裂与合并只使树状数组失效，下次需要时再O(块数)重建
+	"""
+
+	def __init__(self, load=1000):
+		self._load = load
+		self._keys = []         # 键的分块
+		self._vals = []         # 值的分块，与_keys平行
+		self._maxes = []        # 各块的最大键
+		self._len = 0
+		self._tree = None       # 各块长度的树状数组，None表示需要重建
+
+	def __len__(self):
+		return self._len
+
+	def __str__(self):
+		return "{" + ", ".join(["{0}: {1}".format(k, v) for k, v in self.values()]) + "}"
+
+	def is_empty(self):
+		return self._len == 0
+
+	def _locate(self, key):
+		"""返回(块号, 块内下标)，指向第一个不小于key的键；所有键都小于key时块号为块数"""
+		i = bisect_left(self._maxes, key)
+		if i == len(self._maxes):
+			return i, 0
+		return i, bisect_left(self._keys[i], key)
+
+	def search(self, key):
+		i, j = self._locate(key)
+		if i < len(self._maxes) and self._keys[i][j] == key:
+			return self._vals[i][j]
+
+	def insert(self, key, value):
+		keys, maxes = self._keys, self._maxes
+		if not maxes:
+			keys.append([key])
+			self._vals.append([value])
+			maxes.append(key)
+			self._len, self._tree = 1, None
+			return
+		i = bisect_left(maxes, key)
+		if i == len(maxes):         # 比所有键都大，追加到最后一块
+			i -= 1
+			keys[i].append(key)
+			self._vals[i].append(value)
+			maxes[i] = key
+		else:
+			j = bisect_left(keys[i], key)
+			if keys[i][j] == key:   # 覆盖原来的value
+				self._vals[i][j] = value
+				return
+			keys[i].insert(j, key)
+			self._vals[i].insert(j, value)
+		self._len += 1
+		self._tree_add(i, 1)
+		if len(keys[i]) > 2 * self._load:
+			self._split(i)
+
+	def delete(self, key):
+		i, j = self._locate(key)
+		keys, vals, maxes = self._keys, self._vals, self._maxes
+		if i == len(maxes) or keys[i][j] != key:
+			return
+		del keys[i][j]
+		del vals[i][j]
+		self._len -= 1
+		self._tree_add(i, -1)
+		if not keys[i]:
+			del keys[i], vals[i], maxes[i]
+			self._tree = None
+			return
+		maxes[i] = keys[i][-1]
+		if len(keys[i]) < self._load // 2 and len(maxes) > 1:
+			self._merge(i if i + 1 < len(maxes) else i - 1)
+
+	def _split(self, i):
+		"""第i块对半分裂"""
+		keys, vals, half = self._keys, self._vals, self._load
+		keys.insert(i + 1, keys[i][half:])
+		vals.insert(i + 1, vals[i][half:])
+		del keys[i][half:], vals[i][half:]
+		self._maxes.insert(i, keys[i][-1])
+		self._tree = None
+
+	def _merge(self, i):
+		"""合并第i块和第i + 1块，合并后过大则重新分裂"""
+		keys, vals, maxes = self._keys, self._vals, self._maxes
+		keys[i] += keys[i + 1]
+		vals[i] += vals[i + 1]
+		maxes[i] = maxes[i + 1]
+		del keys[i + 1], vals[i + 1], maxes[i + 1]
+		self._tree = None
+		if len(keys[i]) > 2 * self._load:
+			self._split(i)
+
+	def _build_tree(self):
+		"""按各块长度重建树状数组（下标从1开始），O(块数)"""
+		tree = [0] + [len(chunk) for chunk in self._keys]
+		for i in range(1, len(tree)):
+			j = i + (i & -i)
+			if j < len(tree):
+				tree[j] += tree[i]
+		self._tree = tree
+		return tree
+
+	def _tree_add(self, i, delta):
+		"""第i块长度变化delta"""
+		tree = self._tree
+		if tree is None:
+			return
+		i += 1
+		while i < len(tree):
+			tree[i] += delta
+			i += i & -i
+
+	def rank(self, key):
+		"""小于key的键的个数"""
+		i, j = self._locate(key)
+		if i == len(self._maxes):
+			return self._len
+		tree = self._tree or self._build_tree()
+		while i > 0:                # 前i块的长度之和
+			j += tree[i]
+			i -= i & -i
+		return j
+
+	def select(self, pos):
+		"""返回按key升序第pos个(key, value)，支持负数下标"""
+		if pos < 0:
+			pos += self._len
+		if not 0 <= pos < self._len:
+			raise IndexError("in select(): index out of range.")
+		tree = self._tree or self._build_tree()
+		i, bit = 0, 1 << (len(tree) - 1).bit_length()
+		while bit:                  # 在树状数组上下降，找到前缀和不超过pos的最多块数
+			if i + bit < len(tree) and tree[i + bit] <= pos:
+				i += bit
+				pos -= tree[i]
+			bit >>= 1
+		return self._keys[i][pos], self._vals[i][pos]
+
+	def __getitem__(self, pos):
+		return self.select(pos)
+
+	def values(self):
+		"""字典迭代器，按key升序返回(key, value)"""
+		for keys, vals in zip(self._keys, self._vals):
+			yield from zip(keys, vals)
+
+	def range(self, lo=None, hi=None):
+		"""区间迭代器：二分定位起点，按key升序返回lo <= key < hi的(key, value)，lo、hi为None时不设界"""
+		i, j = (0, 0) if lo is None else self._locate(lo)
+		keys, vals = self._keys, self._vals
+		while i < len(keys):
+			chunk = keys[i]
+			end = len(chunk) if hi is None or not hi <= chunk[-1] else bisect_left(chunk, hi, j)
+			yield from zip(chunk[j:end], vals[i][j:end])
+			if end < len(chunk):
+				return
+			i, j = i + 1, 0
+
+	def items_from(self, key):
+		"""从第一个不小于key的元素开始，按key升序返回(key, value)"""
+		return self.range(key)
+
+
+class DictSkipList:
+	"""
+	跳表实现的有序字典
+		·第0层为按key升序的单链表，每个节点以概率P晋升到上一层，层数不超过MAX_LEVEL
+		·查找从最高层开始，每层向右走到下一个key不小于目标的位置再下降一层，期望O(log n)
+		·插入、删除只修改各层前驱的next指针，不需要旋转等整体调整，局部性好，易于改造为并发结构
+	"""
+
+	MAX_LEVEL = 32
+	P = 0.25
+
+	def __init__(self, seed=None):
+		"""
+		:param seed: 层数随机数种子，便于复现
+		"""
+		self._head = SkipNode(None, self.MAX_LEVEL)     # 头节点不存放元素
+		self._level = 1         # 当前使用的层数
+		self._len = 0
+		self._random = Random(seed).random
+
+	def __len__(self):
+		return self._len
+
+	def __str__(self):
+		return "{" + ", ".join(["{0}: {1}".format(k, v) for k, v in self.values()]) + "}"
+
+	def is_empty(self):
+		return self._len == 0
+
+	def _random_level(self):
+		level, rand = 1, self._random
+		while rand() < self.P and level < self.MAX_LEVEL:
+			level += 1
+		return level
+
+	def _predecessors(self, key):
+		"""各层中最后一个key小于给定key的节点"""
+		update, x = [None] * self._level, self._head
+		for i in range(self._level - 1, -1, -1):
+			nxt = x.next[i]
+			while nxt is not None and nxt.elem.key < key:
+				x, nxt = nxt, nxt.next[i]
+			update[i] = x
+		return update
+
+	def search(self, key):
+		x = self._head
+		for i in range(self._level - 1, -1, -1):
+			nxt = x.next[i]
+			while nxt is not None and nxt.elem.key < key:
+				x, nxt = nxt, nxt.next[i]
+		x = x.next[0]
+		if x is not None and x.elem.key == key:
+			return x.elem.value
+
+	def insert(self, key, value):
+		update = self._predecessors(key)
+		x = update[0].next[0]
+		if x is not None and x.elem.key == key:     # 覆盖原来的value
+			x.elem.value = value
+			return
+		level = self._random_level()
+		if level > self._level:         # 新增的层以头节点为前驱
+			update += [self._head] * (level - self._level)
+			self._level = level
+		node = SkipNode(Assoc(key, value), level)
+		for i in range(level):
+			node.next[i] = update[i].next[i]
+			update[i].next[i] = node
+		self._len += 1
+
+	def delete(self, key):
+		update = self._predecessors(key)
+		x = update[0].next[0]
+		if x is None or x.elem.key != key:
+			return
+		for i in range(len(x.next)):
+			update[i].next[i] = x.next[i]
+		head = self._head
+		while self._level > 1 and head.next[self._level - 1] is None:      # 去掉空层
+			self._level -= 1
+		self._len -= 1
+
+	def values(self):
+		"""字典迭代器，按key升序返回(key, value)"""
+		x = self._head.next[0]
+		while x is not None:
+			yield x.elem.key, x.elem.value
+			x = x.next[0]
+
+
+_PERTURB_SHIFT = 5
+_UINT64 = (1 << 64) - 1
+
+_EMPTY = object()       # 空槽位
+_DELETED = object()     # 墓碑：已删除的槽位，查找时需越过，插入时可复用
+
+
+class DictHash:
+	"""
+	基于开放地址散列表实现的字典
+		·键、值、散列值分别存放在三个平行数组中，容量为2的幂，首个槽位为hash & mask
+		·探查序列同CPython的dict：i = (5·i + 1 + perturb) & mask，perturb每步右移5位，
+		  散列值的高位逐步参与定位，低位相同的key（如整数倍的ID、对齐的时间戳）不会挤在一处；
+		  perturb降为0后递推式遍历全部槽位，探查一定能结束
+		·删除时留下墓碑，保证探查链不断开；插入时复用遇到的第一个墓碑
+		·有效元素与墓碑合计超过容量的2/3时扩容，有效元素少于容量的1/8时缩容，重建时清除墓碑
+		·search / insert / delete均摊O(1)
+	"""
+
+	MIN_CAPACITY = 8
+
+	def __init__(self, capacity=MIN_CAPACITY):
+		cap = self.MIN_CAPACITY
+		while cap * 2 < capacity * 3:       # 预留空间，使capacity个元素时负载不超过2/3
+			cap <<= 1
+		self._init_table(cap)
+
+	def _init_table(self, cap):
+		self._keys = [_EMPTY] * cap
+		self._values = [None] * cap
+		self._hashes = [0] * cap
+		self._mask = cap - 1
+		self._count = 0     # 有效元素个数
+		self._used = 0      # 有效元素与墓碑的个数
+
+	def __len__(self):
+		return self._count
+
+	def __str__(self):
+		return "{" + ", ".join(["{0}: {1}".format(k, v) for k, v in self.values()]) + "}"
+
+	def is_empty(self):
+		return self._count == 0
+
+	def _lookup(self, key, h):
+		"""返回key所在的槽位，不存在时返回-1"""
+		keys, hashes, mask = self._keys, self._hashes, self._mask
+		i, perturb = h & mask, h & _UINT64
+		while True:
+			k = keys[i]
+			if k is _EMPTY:
+				return -1
+			if hashes[i] == h and k is not _DELETED and (k is key or k == key):
+				return i
+			perturb >>= _PERTURB_SHIFT
+			i = (5 * i + 1 + perturb) & mask
+
+	def search(self, key):
+		i = self._lookup(key, hash(key))
+		return self._values[i] if i >= 0 else None
+
+	def insert(self, key, value):
+		h = hash(key)
+		keys, hashes, mask = self._keys, self._hashes, self._mask
+		i, perturb, tomb = h & mask, h & _UINT64, -1
+		while True:
+			k = keys[i]
+			if k is _EMPTY:
+				break
+			if k is _DELETED:
+				if tomb < 0:
+					tomb = i
+			elif hashes[i] == h and (k is key or k == key):     # 覆盖原来的value
+				self._values[i] = value
+				return
+			perturb >>= _PERTURB_SHIFT
+			i = (5 * i + 1 + perturb) & mask
+		if tomb >= 0:       # 复用墓碑
+			i = tomb
+		else:
+			self._used += 1
+		keys[i], hashes[i], self._values[i] = key, h, value
+		self._count += 1
+		if self._used * 3 > len(keys) * 2:
+			self._resize()
+
+	def delete(self, key):
+		i = self._lookup(key, hash(key))
+		if i < 0:
+			return
+		self._keys[i], self._values[i] = _DELETED, None
+		self._count -= 1
+		if self._count * 8 < len(self._keys) and len(self._keys) > self.MIN_CAPACITY:
+			self._resize()
+
+	def _resize(self):
+		"""按有效元素个数重建散列表（负载约1/3），同时清除墓碑"""
+		keys, values, hashes = self._keys, self._values, self._hashes
+		cap = self.MIN_CAPACITY
+		while cap < self._count * 3:
+			cap <<= 1
+		self._init_table(cap)
+		new_keys, new_values, new_hashes, mask = self._keys, self._values, self._hashes, self._mask
+		for k, v, h in zip(keys, values, hashes):
+			if k is _EMPTY or k is _DELETED:
+				continue
+			i, perturb = h & mask, h & _UINT64
+			while new_keys[i] is not _EMPTY:
+				perturb >>= _PERTURB_SHIFT
+				i = (5 * i + 1 + perturb) & mask
+			new_keys[i], new_values[i], new_hashes[i] = k, v, h
+			self._count += 1
+		self._used = self._count
+
+	def values(self):
+		"""字典迭代器，按槽位顺序返回(key, value)"""
+		for k, v in zip(self._keys, self._values):
+			if k is not _EMPTY and k is not _DELETED:
+				yield k, v
 
 
 if __name__ == '__main__':
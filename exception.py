@@ -24,3 +24,13 @@ class PriorQueueError(ValueError):
 class GraphError(ValueError):
 	"""图结构异常"""
 	pass
+
+
+class SnapshotError(ValueError):
+	"""字典快照文件异常"""
+	pass
+
+
+class TreeError(ValueError):
+	"""树结构异常"""
+	pass
@@ -668,6 +668,54 @@ class DuplexLinkList(LinkList):
 					return e
 				idx, p = idx - 1, p.prev
 
+	# 以下为节点级操作：调用方持有节点引用，插入、摘除均为O(1)（不适用于循环双向链表）
+
+	def first_node(self):
+		"""返回表头节点，空表时返回None"""
+		return self._head
+
+	def insert_node_after(self, prev, node):
+		"""
+		在节点prev之后接入已有的节点node
+		:param prev: 表中的节点，为None时接在表头
+		:param node: 不在任何链表中的DuplexLinearNode
+		:return: None
+		"""
+		nxt = self._head if prev is None else prev.next
+		node.prev, node.next = prev, nxt
+		if prev is None:
+			self._head = node
+		else:
+			prev.next = node
+		if nxt is None:
+			self._rear = node
+		else:
+			nxt.prev = node
+		self._count += 1
+
+	def append_node(self, node):
+		"""在表尾接入已有的节点"""
+		self.insert_node_after(self._rear, node)
+
+	def unlink(self, node):
+		"""从表中摘下节点node"""
+		if node.prev is None:
+			self._head = node.next
+		else:
+			node.prev.next = node.next
+		if node.next is None:
+			self._rear = node.prev
+		else:
+			node.next.prev = node.prev
+		node.prev = node.next = None
+		self._count -= 1
+
+	def move_to_end(self, node):
+		"""把表中的节点node移到表尾"""
+		if node is not self._rear:
+			self.unlink(node)
+			self.append_node(node)
+
 
 class CycleDuplexLinkList(DuplexLinkList):
 	"""循环双向链表"""
@@ -2,8 +2,11 @@
 数据节点定义模块
 
 继承关系
-	·LinearNode <- DuplexLinearNode
-	·BinaryNode
+	·LinearNode <- DuplexLinearNode <- CacheNode, FreqNode
+	·SkipNode
+	·BinaryNode <- AVLNode
+	·BinaryNode2 <- RBNode
+	·BTreeNode
 """
 
 
@@ -26,6 +29,41 @@ class DuplexLinearNode(LinearNode):
 		self.prev = prev
 
 
+class CacheNode(DuplexLinearNode):
+	"""缓存条目节点，elem为缓存的值"""
+
+	def __init__(self, key, elem, weight=1):
+		super(CacheNode, self).__init__(elem)
+		self.key = key
+		self.weight = weight    # 条目的权重（按权重限制容量时使用）
+		self.expire = None      # 过期时间（TTL策略）
+		self.bucket = None      # 所在的访问次数桶（LFU策略）
+
+
+class FreqNode(DuplexLinearNode):
+	"""LFU访问次数桶节点，elem为访问次数等于freq的条目链表"""
+
+	def __init__(self, freq, elem):
+		super(FreqNode, self).__init__(elem)
+		self.freq = freq
+
+
+class SkipNode:
+	"""跳表节点，next[i]为第i层的后继"""
+
+	def __init__(self, elem, level):
+		self.elem = elem
+		self.next = [None] * level
+
+	def __str__(self):
+		return str(self.elem)
+
+
+def subtree_size(t):
+	"""子树的节点个数，空树为0"""
+	return t.size if t is not None else 0
+
+
 class BinaryNode:
 	"""二叉节点"""
 
@@ -33,6 +71,7 @@ class BinaryNode:
 		self.elem = elem
 		self.left = left
 		self.right = right
+		self.size = 1 + subtree_size(left) + subtree_size(right)      # 子树的节点个数，由字典树维护
 
 	def __str__(self):
 		return str(self.elem)
@@ -46,6 +85,7 @@ class BinaryNode2:
 		self.parent = parent
 		self.right = right
 		self.left = left
+		self.size = 1 + subtree_size(left) + subtree_size(right)      # 子树的节点个数，由字典树维护
 
 	def __str__(self):
 		return str(self.elem)
@@ -57,3 +97,26 @@ class AVLNode(BinaryNode):
 	def __init__(self, elem):
 		super(AVLNode, self).__init__(elem)
 		self.bf = 0     # 平衡因子（balance factor, BF）取值范围：{-1，0，1}
+
+
+class RBNode(BinaryNode2):
+	"""红黑树节点"""
+
+	def __init__(self, elem, parent=None):
+		super(RBNode, self).__init__(elem, parent)
+		self.red = True     # 新节点为红色，空子树（None）视为黑色
+
+
+class BTreeNode:
+	"""
+	B+树节点
+		·叶节点：keys、vals为平行的有序数组，next指向右边的叶节点
+		·内部节点：children比keys多一个，keys[i]为children[i + 1]子树的下界
+	"""
+
+	def __init__(self, leaf=True):
+		self.leaf = leaf
+		self.keys = []
+		self.vals = []          # 仅叶节点使用
+		self.children = []      # 仅内部节点使用
+		self.next = None        # 仅叶节点使用
@@ -91,6 +91,14 @@ class PriorQue2:
 			self.siftdown(e, 0, len(elems))
 		return e0
 
+	def replace(self, e):
+		"""弹出堆顶元素并插入e，只做一次向下筛选"""
+		if self.is_empty():
+			raise PriorQueueError("in replace(): nothing can be returned in queue")
+		e0 = self._elems[0]
+		self.siftdown(e, 0, len(self._elems))
+		return e0
+
 	def siftdown(self, e, begin, end):
 		"""向下筛选"""
 		elems, i, j = self._elems, begin, begin * 2 + 1
@@ -110,8 +118,24 @@ class PriorQue2:
 			self.siftdown(self._elems[i], i, end)
 
 
-def heap_sort(elems, reverse=False):
-	"""堆排序"""
+def heap_sort(elems, reverse=False, key=None):
+	"""
+	堆排序
+	:param elems: 待排序列表，原地排序
+	:param reverse: 是否降序
+	:param key: 排序键函数，每个元素只调用一次，(key, 下标)缓存后参与比较；
+		reverse时下标取负，降序排列后相等的key仍保持原顺序，与sorting._decorate一致
+	:return: None
+	"""
+	if key is not None:
+		sign = -1 if reverse else 1
+		decorated = [(k, sign * i) for i, k in enumerate(map(key, elems))]
+		heap_sort(decorated, reverse)
+		src = elems[:]
+		elems[:] = [src[sign * i] for _, i in decorated]
+		return
+	if len(elems) < 2:
+		return
 	if not reverse:
 		def siftdown(elems, e, begin, end):
 			"""大顶堆"""
@@ -0,0 +1,71 @@
+"""
+有序表查找基准测试
+
+	对比bi_search2、lower_bound与两种布局的StaticSearchIndex在不同规模下的单次查询耗时
+	键为0, 2, 4, ...的偶数，查询在[0, 2n)中均匀随机，命中率约一半
+
+	用法：
+		python search_benchmark.py --sizes 1e4,1e5,1e6,1e7 --queries 100000
+	规模达到1e8时键数组和位置数组各约占800MB内存，构建需数分钟
+"""
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from random import Random
+
+from binary_search import StaticSearchIndex, bi_search2, lower_bound
+
+
+def _bench(fn, queries):
+	start = time.perf_counter()
+	for q in queries:
+		fn(q)
+	return (time.perf_counter() - start) / len(queries) * 1e9
+
+
+def run(sizes, nqueries=100000, seed=0, log=None):
+	"""
+	运行全部规模
+	:return: 结果字典列表，ns_per_query为单次查询的平均纳秒数
+	"""
+	results = []
+	rng = Random(seed)
+	for n in sizes:
+		keys = array('q', range(0, 2 * n, 2))
+		queries = [rng.randrange(2 * n) for _ in range(nqueries)]
+		cases = [
+			('bi_search2', lambda q: bi_search2(keys, q), 0.0),
+			('lower_bound', lambda q: lower_bound(keys, q), 0.0),
+		]
+		for layout in ('eytzinger', 'btree'):
+			start = time.perf_counter()
+			index = StaticSearchIndex(keys, layout)
+			cases.append(('index_' + layout, index.lower_bound, time.perf_counter() - start))
+		for name, fn, build in cases:
+			record = {'method': name, 'n': n, 'ns_per_query': _bench(fn, queries), 'build_seconds': build}
+			results.append(record)
+			if log is not None:
+				log(record)
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="sorted-table search benchmark")
+	parser.add_argument('--sizes', default='1e4,1e5,1e6,1e7')
+	parser.add_argument('--queries', type=int, default=100000)
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--out', help="write results as JSON")
+	args = parser.parse_args(argv)
+	results = run([int(float(s)) for s in args.sizes.split(',')], args.queries, args.seed,
+		log=lambda r: print("{method:>16} n={n:<10} {ns_per_query:10.1f} ns/query  build {build_seconds:.2f}s".format(**r), flush=True))
+	if args.out:
+		with open(args.out, 'w') as f:
+			json.dump(results, f, indent=1)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,10 +1,52 @@
 """线性表的排序算法"""
-from random import randint, seed
+import os
+import pickle
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from multiprocessing.shared_memory import SharedMemory
+from operator import itemgetter
+from random import randint, sample, seed
+
+from priority_queue import PriorQue2, heap_sort
+
 seed(100)
 
 
-def bubble_sort(alist: list):
+def _decorate(alist, key, reverse):
+	"""
+	装饰：每个元素的key只计算一次，与其原下标组成(key, index)，比较时不再调用key
+		·下标参与比较，相等的key按原顺序排列，不稳定的算法也得到稳定的结果
+		·reverse时下标取负，升序排序后整体翻转即得到稳定的降序
+	"""
+	keys = alist if key is None else map(key, alist)
+	if reverse:
+		return [(k, -i) for i, k in enumerate(keys)]
+	return [(k, i) for i, k in enumerate(keys)]
+
+
+def _undecorate(alist, decorated, reverse):
+	"""去装饰：按已排序的下标从alist中取出元素，返回新列表"""
+	if reverse:
+		decorated.reverse()
+		return [alist[-i] for _, i in decorated]
+	return [alist[i] for _, i in decorated]
+
+
+def _sort_keyed(sorter, alist: list, key, reverse):
+	"""按key/reverse对alist原地排序（装饰-排序-去装饰），sorter为原地排序函数"""
+	decorated = _decorate(alist, key, reverse)
+	sorter(decorated)
+	alist[:] = _undecorate(alist, decorated, reverse)
+
+
+def bubble_sort(alist: list, key=None, reverse=False):
 	"""冒泡排序"""
+	if key is not None or reverse:
+		return _sort_keyed(bubble_sort, alist, key, reverse)
 	n = len(alist)
 	for j in range(n - 1):
 		flag = True     # 交换行为标识
@@ -16,8 +58,10 @@ def bubble_sort(alist: list):
 			return
 
 
-def select_sort(alist: list):
+def select_sort(alist: list, key=None, reverse=False):
 	"""选择排序"""
+	if key is not None or reverse:
+		return _sort_keyed(select_sort, alist, key, reverse)
 	n = len(alist)
 	for j in range(n - 1):
 		min_index = j
@@ -26,29 +70,90 @@ def select_sort(alist: list):
 		alist[j], alist[min_index] = alist[min_index], alist[j]
 
 
-def insert_sort(alist: list):
-	"""插入排序(希尔排序gap=1)"""
+def insert_sort(alist: list, key=None, reverse=False, binary=False):
+	"""
+	插入排序(希尔排序gap=1)
+		·元素后移腾出位置，遇到第一个不大于它的元素即停止，有序输入为O(n)
+		·binary为True时用二分查找插入位置，比较次数降为O(n log n)，适合比较代价高的元素
+	"""
+	if key is not None or reverse:
+		return _sort_keyed(lambda d: insert_sort(d, binary=binary), alist, key, reverse)
 	n = len(alist)
-	for j in range(1, n):
-		for i in range(j, 0, -1):
-			if alist[i] < alist[i - 1]:
-				alist[i], alist[i - 1] = alist[i - 1], alist[i]
+	if binary:
+		_binary_insertion(alist, 0, n, 1)
+	else:
+		_insertion_range(alist, 0, n - 1)
 
 
-def shell_sort(alist: list):
-	"""希尔排序"""
-	n = len(alist)
+def _shell_gaps(n):
+	"""Shell原始序列：n/2, n/4, ..., 1"""
 	gap = n // 2
 	while gap > 0:
-		for j in range(gap, n):
-			for i in range(j, 0, -gap):
-				if alist[i] < alist[i - gap]:
-					alist[i], alist[i - gap] = alist[i - gap], alist[i]
-		gap //= 2   # 缩短gap步长
+		yield gap
+		gap //= 2
 
 
-def quick_sort(alist: list, first, last):
-	"""原地快速排序"""
+def _ciura_gaps(n):
+	"""Ciura序列（经验最优），超出部分按×2.25外推"""
+	gaps = [1, 4, 10, 23, 57, 132, 301, 701, 1750]
+	while gaps[-1] < n:
+		gaps.append(int(gaps[-1] * 2.25))
+	return reversed([g for g in gaps if g < n] or [1])
+
+
+def _tokuda_gaps(n):
+	"""Tokuda序列：h(k) = ceil((9^k - 4^k) / (5·4^(k-1)))"""
+	gaps, k = [1], 2
+	while True:
+		g = -(-(9 ** k - 4 ** k) // (5 * 4 ** (k - 1)))
+		if g >= n:
+			break
+		gaps.append(g)
+		k += 1
+	return reversed(gaps)
+
+
+def _sedgewick_gaps(n):
+	"""Sedgewick序列：1, 4^k + 3·2^(k-1) + 1，即1, 8, 23, 77, 281, ..."""
+	gaps, k = [1], 1
+	while 4 ** k + 3 * 2 ** (k - 1) + 1 < n:
+		gaps.append(4 ** k + 3 * 2 ** (k - 1) + 1)
+		k += 1
+	return reversed(gaps)
+
+
+GAP_SEQUENCES = {
+	'ciura': _ciura_gaps,
+	'tokuda': _tokuda_gaps,
+	'sedgewick': _sedgewick_gaps,
+	'shell': _shell_gaps,
+}
+
+
+def shell_sort(alist: list, key=None, reverse=False, gaps='ciura'):
+	"""
+	希尔排序
+	:param gaps: 步长序列，可选'ciura'（默认）、'tokuda'、'sedgewick'、'shell'（n/2折半）
+	"""
+	if key is not None or reverse:
+		return _sort_keyed(lambda d: shell_sort(d, gaps=gaps), alist, key, reverse)
+	if gaps not in GAP_SEQUENCES:
+		raise ValueError("in shell_sort(): unknown gap sequence {!r}.".format(gaps))
+	n = len(alist)
+	for gap in GAP_SEQUENCES[gaps](n):
+		for j in range(gap, n):     # 带步长的插入排序：后移元素，遇到有序位置即停
+			e, i = alist[j], j
+			while i >= gap and e < alist[i - gap]:
+				alist[i] = alist[i - gap]
+				i -= gap
+			alist[i] = e
+
+
+INSERTION_CUTOFF = 16   # 内省排序中改用插入排序的分区长度
+
+
+def _quick_sort_classic(alist: list, first, last):
+	"""原地快速排序（以首元素为枢轴，两侧递归）"""
 	if first >= last:
 		return
 
@@ -70,50 +175,583 @@ def quick_sort(alist: list, first, last):
 	# 退出循环时low == high
 	alist[low] = mid_value
 
-	quick_sort(alist, first, low - 1)   # 左侧快排
-	quick_sort(alist, low + 1, last)    # 右侧快排
+	_quick_sort_classic(alist, first, low - 1)   # 左侧快排
+	_quick_sort_classic(alist, low + 1, last)    # 右侧快排
+
+
+def _insertion_range(alist: list, lo, hi):
+	"""对闭区间alist[lo..hi]做插入排序，元素后移而非交换，遇到有序位置即停"""
+	for j in range(lo + 1, hi + 1):
+		e, i = alist[j], j
+		while i > lo and e < alist[i - 1]:
+			alist[i] = alist[i - 1]
+			i -= 1
+		alist[i] = e
+
+
+def _median_of_three(alist: list, i, j, k):
+	"""返回三个下标中对应元素为中位数的下标"""
+	a, b, c = alist[i], alist[j], alist[k]
+	if a < b:
+		if b < c:
+			return j
+		return k if a < c else i
+	if a < c:
+		return i
+	return k if b < c else j
+
+
+def _choose_pivot(alist: list, lo, hi):
+	"""枢轴选取：短分区用三数取中，长分区用九数取中（ninther）"""
+	n = hi - lo + 1
+	mid = lo + n // 2
+	if n > 40:
+		s = n // 8
+		a = _median_of_three(alist, lo, lo + s, lo + 2 * s)
+		b = _median_of_three(alist, mid - s, mid, mid + s)
+		c = _median_of_three(alist, hi - 2 * s, hi - s, hi)
+		return _median_of_three(alist, a, b, c)
+	return _median_of_three(alist, lo, mid, hi)
+
+
+def _partition(alist: list, lo, hi):
+	"""Hoare划分，遇到与枢轴相等的元素两侧都停下交换，重复元素也能均分。返回枢轴最终下标"""
+	p = _choose_pivot(alist, lo, hi)
+	alist[lo], alist[p] = alist[p], alist[lo]
+	pivot = alist[lo]
+	i, j = lo + 1, hi
+	while True:
+		while i <= j and alist[i] < pivot:
+			i += 1
+		while i <= j and pivot < alist[j]:
+			j -= 1
+		if i >= j:
+			break
+		alist[i], alist[j] = alist[j], alist[i]
+		i, j = i + 1, j - 1
+	alist[lo], alist[j] = alist[j], alist[lo]
+	return j
+
+
+def _partition3(alist: list, lo, hi, p=None):
+	"""
+	三路划分（荷兰国旗问题）：一趟扫描把闭区间分成 < pivot | == pivot | > pivot 三段
+	:param p: 枢轴下标，缺省时由_choose_pivot选取
+	:return: (lt, gt)，alist[lt..gt]均等于枢轴，已就位
+	"""
+	pivot = alist[_choose_pivot(alist, lo, hi) if p is None else p]
+	lt, i, gt = lo, lo, hi
+	while i <= gt:
+		e = alist[i]
+		if e < pivot:
+			alist[lt], alist[i] = e, alist[lt]
+			lt, i = lt + 1, i + 1
+		elif pivot < e:
+			alist[gt], alist[i] = e, alist[gt]
+			gt -= 1
+		else:
+			i += 1
+	return lt, gt
+
+
+def _heap_sort_range(alist: list, lo, hi):
+	"""对闭区间alist[lo..hi]做堆排序"""
+	sub = alist[lo:hi + 1]
+	heap_sort(sub)
+	alist[lo:hi + 1] = sub
 
 
-def quick_sort2(alist: list):
+def _intro_sort(alist: list, first, last, three_way=False):
+	"""
+	内省排序
+		·三数/九数取中选取枢轴
+		·three_way为True时采用三路划分，与枢轴相等的元素一次性就位，不再参与递归
+		·显式栈：较大的一侧入栈，循环处理较小的一侧，栈深度不超过log n
+		·分区长度不超过INSERTION_CUTOFF时改用插入排序
+		·划分深度超过2·log n时改用堆排序，保证最坏O(n log n)
+	"""
+	stack = [(first, last, 2 * (last - first + 1).bit_length())]
+	while stack:
+		lo, hi, depth = stack.pop()
+		while hi - lo + 1 > INSERTION_CUTOFF:
+			if depth == 0:
+				_heap_sort_range(alist, lo, hi)
+				break
+			depth -= 1
+			if three_way:
+				lt, gt = _partition3(alist, lo, hi)
+			else:
+				lt = gt = _partition(alist, lo, hi)
+			if lt - lo < hi - gt:
+				stack.append((gt + 1, hi, depth))
+				hi = lt - 1
+			else:
+				stack.append((lo, lt - 1, depth))
+				lo = gt + 1
+		else:
+			_insertion_range(alist, lo, hi)
+
+
+def quick_sort(alist: list, first=0, last=None, mode='intro', key=None, reverse=False):
+	"""
+	原地快速排序
+	:param alist: 待排序列表
+	:param first: 排序区间起点，默认为0
+	:param last: 排序区间终点（含），默认为len(alist) - 1
+	:param mode:
+		·'intro'    default，内省排序，任意输入最坏O(n log n)
+		·'3way'     三路划分的内省排序，适合重复键很多的输入，时间随不同键的个数而非n增长
+		·'classic'  以首元素为枢轴的递归快排，有序输入时退化为O(n^2)
+	:param key: 排序键函数，每个元素只调用一次
+	:param reverse: 是否降序
+	:return: None
+	"""
+	if last is None:
+		last = len(alist) - 1
+	if key is not None or reverse:
+		sub = alist[first:last + 1]
+		_sort_keyed(lambda d: quick_sort(d, mode=mode), sub, key, reverse)
+		alist[first:last + 1] = sub
+		return
+	if mode in ('intro', '3way'):
+		if first < last:
+			_intro_sort(alist, first, last, three_way=(mode == '3way'))
+	elif mode == 'classic':
+		_quick_sort_classic(alist, first, last)
+	else:
+		raise ValueError("in quick_sort(): unknown mode {!r}.".format(mode))
+
+
+def quick_sort2(alist: list, key=None, reverse=False):
 	"""非原地快速排序"""
+	if key is not None or reverse:
+		decorated = _decorate(alist, key, reverse)
+		return _undecorate(alist, quick_sort2(decorated), reverse)
 	if len(alist) < 2:
 		return alist
 	else:
 		tmp = alist[0]
-		less = [item for item in alist[1:] if item < tmp]       # 占用额外空间！
-		more = [item for item in alist[1:] if item >= tmp]      # 占用额外空间！
-		return quick_sort2(less) + [tmp] + quick_sort2(more)
+		less = [item for item in alist if item < tmp]       # 占用额外空间！
+		equal = [item for item in alist if item == tmp]     # 与枢轴相等的元素不再递归
+		more = [item for item in alist if tmp < item]       # 占用额外空间！
+		return quick_sort2(less) + equal + quick_sort2(more)
+
+
+def _mom_pivot(alist: list, lo, hi):
+	"""中位数的中位数（BFPRT）：返回枢轴下标，保证划分后较小一侧不少于约3/10"""
+	n = hi - lo + 1
+	if n <= 5:
+		_insertion_range(alist, lo, hi)
+		return lo + n // 2
+	store = lo
+	for i in range(lo, hi + 1, 5):      # 每5个一组取中位数，移到区间前部
+		j = min(i + 4, hi)
+		_insertion_range(alist, i, j)
+		m = (i + j) // 2
+		alist[store], alist[m] = alist[m], alist[store]
+		store += 1
+	mid = lo + (store - lo) // 2
+	_select(alist, lo, store - 1, mid, 0)
+	return mid
+
+
+def _select(alist: list, lo, hi, k, depth):
+	"""
+	内省选择：使alist[k]成为闭区间alist[lo..hi]排序后该位置上的元素
+	先用三数/九数取中的快速选择，划分depth次仍未结束时改用中位数的中位数，保证最坏线性时间
+	"""
+	while hi - lo + 1 > INSERTION_CUTOFF:
+		if depth == 0:
+			p = _mom_pivot(alist, lo, hi)
+		else:
+			depth -= 1
+			p = None
+		lt, gt = _partition3(alist, lo, hi, p)
+		if k < lt:
+			hi = lt - 1
+		elif k > gt:
+			lo = gt + 1
+		else:
+			return
+	_insertion_range(alist, lo, hi)
+
+
+def _select_keyed(op, alist: list, key, reverse):
+	"""选择类操作的装饰：reverse时用_Desc包装key，结果前部即为较大的元素，不能像排序那样整体翻转"""
+	keys = alist if key is None else map(key, alist)
+	if reverse:
+		decorated = [(_Desc(k), i) for i, k in enumerate(keys)]
+	else:
+		decorated = [(k, i) for i, k in enumerate(keys)]
+	op(decorated)
+	alist[:] = [alist[i] for _, i in decorated]
 
 
-def merge_sort(alist: list):
-	"""归并排序"""
+def nth_element(alist: list, k, key=None, reverse=False):
+	"""
+	部分排序：使alist[k]就位，其左侧元素都不大于它，右侧元素都不小于它，O(n)
+	:param alist: 待处理列表，原地修改
+	:param k: 下标，支持负数
+	:param key: 排序键函数
+	:param reverse: 是否按降序就位
+	:return: alist[k]
+	"""
 	n = len(alist)
+	if k < 0:
+		k += n
+	if not 0 <= k < n:
+		raise IndexError("in nth_element(): index out of range.")
+	if key is not None or reverse:
+		_select_keyed(lambda d: nth_element(d, k), alist, key, reverse)
+	else:
+		_select(alist, 0, n - 1, k, 2 * n.bit_length())
+	return alist[k]
 
-	# 递归停止条件
-	if n <= 1:
-		return alist
 
-	# 递归拆分
-	mid = n // 2
-	left_li = merge_sort(alist[:mid])      # left：采用归并排序后形成的新的有序列表
-	right_li = merge_sort(alist[mid:])     # right：采用归并排序后形成的新的有序列表
+def partial_sort(alist: list, k, key=None, reverse=False):
+	"""
+	部分排序：使alist[:k]为整个列表中最小的k个元素且有序，其余元素顺序不定，O(n + k log k)
+	:param alist: 待处理列表，原地修改
+	:param k: 需要排好序的前缀长度
+	:param key: 排序键函数
+	:param reverse: 为True时取最大的k个元素降序排列
+	:return: None
+	"""
+	n = len(alist)
+	if key is not None or reverse:
+		return _select_keyed(lambda d: partial_sort(d, k), alist, key, reverse)
+	if k <= 0:
+		return
+	if k < n:
+		_select(alist, 0, n - 1, k - 1, 2 * n.bit_length())
+	quick_sort(alist, 0, min(k, n) - 1)
+
+
+def top_k(iterable, k, key=None):
+	"""
+	流式取最大的k个元素，按降序返回（key相等时先出现的在前）
+	用PriorQue2维护容量为k的小顶堆，新元素只与堆顶比较一次，内存O(k)
+	:param iterable: 任意可迭代对象
+	:param k: 元素个数
+	:param key: 排序键函数，每个元素只调用一次
+	:return: 列表
+	"""
+	if k <= 0:
+		return []
+	it = iter(iterable)
+	if key is None:
+		heap = PriorQue2([(e, -i, e) for i, e in zip(range(k), it)])
+		for i, e in enumerate(it, k):
+			if heap.peek()[0] < e:
+				heap.replace((e, -i, e))
+	else:
+		heap = PriorQue2([(key(e), -i, e) for i, e in zip(range(k), it)])
+		for i, e in enumerate(it, k):
+			ke = key(e)
+			if heap.peek()[0] < ke:
+				heap.replace((ke, -i, e))
+	res = []
+	while not heap.is_empty():
+		res.append(heap.dequeue()[2])
+	res.reverse()
+	return res
+
+
+MIN_MERGE = 64      # 短于此长度的列表直接二分插入排序
+MIN_GALLOP = 7      # 进入飞奔模式的初始阈值
+
+
+def _min_run(n):
+	"""计算最小游程长度minrun，使n / minrun恰好或略小于2的幂"""
+	r = 0
+	while n >= MIN_MERGE:
+		r |= n & 1
+		n >>= 1
+	return n + r
+
+
+def _binary_insertion(alist: list, lo, hi, start):
+	"""二分插入排序：alist[lo:start]已有序，将alist[start:hi]逐个插入（稳定）"""
+	for i in range(start, hi):
+		pivot = alist[i]
+		left, right = lo, i
+		while left < right:
+			mid = (left + right) >> 1
+			if pivot < alist[mid]:
+				right = mid
+			else:
+				left = mid + 1
+		alist[left + 1:i + 1] = alist[left:i]     # 整体右移一位
+		alist[left] = pivot
+
+
+def _count_run(alist: list, lo, hi):
+	"""从lo开始寻找自然游程，严格降序游程原地翻转（保证稳定），返回游程终点"""
+	run_hi = lo + 1
+	if run_hi == hi:
+		return hi
+	if alist[run_hi] < alist[lo]:       # 严格降序
+		run_hi += 1
+		while run_hi < hi and alist[run_hi] < alist[run_hi - 1]:
+			run_hi += 1
+		alist[lo:run_hi] = alist[lo:run_hi][::-1]
+	else:                               # 非降序
+		run_hi += 1
+		while run_hi < hi and not alist[run_hi] < alist[run_hi - 1]:
+			run_hi += 1
+	return run_hi
+
+
+def _gallop_left(key, a, base, n, hint):
+	"""飞奔查找：返回k，满足a[base + k - 1] < key <= a[base + k]"""
+	last_ofs, ofs = 0, 1
+	if a[base + hint] < key:        # 向右飞奔
+		max_ofs = n - hint
+		while ofs < max_ofs and a[base + hint + ofs] < key:
+			last_ofs, ofs = ofs, (ofs << 1) + 1
+		ofs = min(ofs, max_ofs)
+		last_ofs, ofs = last_ofs + hint, ofs + hint
+	else:                           # 向左飞奔
+		max_ofs = hint + 1
+		while ofs < max_ofs and not a[base + hint - ofs] < key:
+			last_ofs, ofs = ofs, (ofs << 1) + 1
+		ofs = min(ofs, max_ofs)
+		last_ofs, ofs = hint - ofs, hint - last_ofs
+	# 此时a[base + last_ofs] < key <= a[base + ofs]，在区间内二分
+	last_ofs += 1
+	while last_ofs < ofs:
+		mid = last_ofs + ((ofs - last_ofs) >> 1)
+		if a[base + mid] < key:
+			last_ofs = mid + 1
+		else:
+			ofs = mid
+	return ofs
+
+
+def _gallop_right(key, a, base, n, hint):
+	"""飞奔查找：返回k，满足a[base + k - 1] <= key < a[base + k]"""
+	last_ofs, ofs = 0, 1
+	if key < a[base + hint]:        # 向左飞奔
+		max_ofs = hint + 1
+		while ofs < max_ofs and key < a[base + hint - ofs]:
+			last_ofs, ofs = ofs, (ofs << 1) + 1
+		ofs = min(ofs, max_ofs)
+		last_ofs, ofs = hint - ofs, hint - last_ofs
+	else:                           # 向右飞奔
+		max_ofs = n - hint
+		while ofs < max_ofs and not key < a[base + hint + ofs]:
+			last_ofs, ofs = ofs, (ofs << 1) + 1
+		ofs = min(ofs, max_ofs)
+		last_ofs, ofs = last_ofs + hint, ofs + hint
+	# 此时a[base + last_ofs] <= key < a[base + ofs]，在区间内二分
+	last_ofs += 1
+	while last_ofs < ofs:
+		mid = last_ofs + ((ofs - last_ofs) >> 1)
+		if key < a[base + mid]:
+			ofs = mid
+		else:
+			last_ofs = mid + 1
+	return ofs
+
+
+class _MergeState:
+	"""
+	自然归并排序的状态
+		·buf：整个排序过程复用的一块缓冲区，长度为n // 2
+		·runs：待归并的游程栈，元素为(起点, 长度)
+		·min_gallop：自适应的飞奔阈值
+	"""
+
+	def __init__(self, alist: list):
+		self.alist = alist
+		self.buf = [None] * (len(alist) // 2 + 1)
+		self.runs = []
+		self.min_gallop = MIN_GALLOP
+
+	def sort(self, lo, hi):
+		alist, n = self.alist, hi - lo
+		if n < 2:
+			return
+		if n < MIN_MERGE:       # 短列表：一个游程 + 二分插入
+			_binary_insertion(alist, lo, hi, _count_run(alist, lo, hi))
+			return
+		min_run = _min_run(n)
+		while lo < hi:
+			run_hi = _count_run(alist, lo, hi)
+			if run_hi - lo < min_run:       # 游程过短，用二分插入扩展到min_run
+				force = min(lo + min_run, hi)
+				_binary_insertion(alist, lo, force, run_hi)
+				run_hi = force
+			self.runs.append((lo, run_hi - lo))
+			self.merge_collapse()
+			lo = run_hi
+		self.merge_force_collapse()
+
+	def merge_collapse(self):
+		"""维持游程栈的不变式：len[i-2] > len[i-1] + len[i]，len[i-1] > len[i]"""
+		runs = self.runs
+		while len(runs) > 1:
+			n = len(runs) - 2
+			if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+					(n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+				if runs[n - 1][1] < runs[n + 1][1]:
+					n -= 1
+			elif runs[n][1] > runs[n + 1][1]:
+				break
+			self.merge_at(n)
+
+	def merge_force_collapse(self):
+		"""归并栈中剩余的全部游程"""
+		runs = self.runs
+		while len(runs) > 1:
+			n = len(runs) - 2
+			if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+				n -= 1
+			self.merge_at(n)
 
-	# 交替合并
-	res = []                               # 归并要占用额外的空间复杂度
-	while left_li and right_li:
-		if left_li[0] <= right_li[0]:
-			res.append(left_li.pop(0))
+	def merge_at(self, i):
+		"""归并栈中第i和i+1个游程"""
+		alist, runs = self.alist, self.runs
+		base_a, na = runs[i]
+		base_b, nb = runs[i + 1]
+		runs[i] = (base_a, na + nb)
+		del runs[i + 1]
+
+		# A中不大于B[0]的前缀已就位
+		k = _gallop_right(alist[base_b], alist, base_a, na, 0)
+		base_a, na = base_a + k, na - k
+		if na == 0:
+			return
+		# B中不小于A[-1]的后缀已就位
+		nb = _gallop_left(alist[base_a + na - 1], alist, base_b, nb, nb - 1)
+		if nb == 0:
+			return
+		if na <= nb:
+			self.merge_lo(base_a, na, base_b, nb)
 		else:
-			res.append(right_li.pop(0))
-	if left_li:
-		res += left_li
-	if right_li:
-		res += right_li
+			self.merge_hi(base_a, na, base_b, nb)
+
+	def merge_lo(self, base_a, na, base_b, nb):
+		"""na <= nb：A复制到缓冲区，自左向右归并。前提：B[0] < A[0]，A[-1] > B[-1]"""
+		alist, buf = self.alist, self.buf
+		buf[:na] = alist[base_a:base_a + na]
+		pa, pb, dest = 0, base_b, base_a
+		end_b = base_b + nb
+		alist[dest] = alist[pb]
+		dest, pb = dest + 1, pb + 1
+		min_gallop = self.min_gallop
+		while pb < end_b:
+			count_a = count_b = 0
+			while True:     # 逐对比较模式
+				if alist[pb] < buf[pa]:
+					alist[dest] = alist[pb]
+					dest, pb = dest + 1, pb + 1
+					count_a, count_b = 0, count_b + 1
+					if pb == end_b or count_b >= min_gallop:
+						break
+				else:
+					alist[dest] = buf[pa]
+					dest, pa = dest + 1, pa + 1
+					count_a, count_b = count_a + 1, 0
+					if count_a >= min_gallop:
+						break
+			while pb < end_b:       # 飞奔模式
+				min_gallop -= min_gallop > 1
+				count_a = _gallop_right(alist[pb], buf, pa, na - pa, 0)
+				if count_a:
+					alist[dest:dest + count_a] = buf[pa:pa + count_a]
+					dest, pa = dest + count_a, pa + count_a
+				alist[dest] = alist[pb]
+				dest, pb = dest + 1, pb + 1
+				if pb == end_b:
+					break
+				count_b = _gallop_left(buf[pa], alist, pb, end_b - pb, 0)
+				if count_b:
+					alist[dest:dest + count_b] = alist[pb:pb + count_b]
+					dest, pb = dest + count_b, pb + count_b
+					if pb == end_b:
+						break
+				alist[dest] = buf[pa]
+				dest, pa = dest + 1, pa + 1
+				if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+					min_gallop += 1     # 飞奔收益低，提高阈值
+					break
+		# A[-1]大于B中所有元素，因此B总是先耗尽
+		alist[dest:dest + na - pa] = buf[pa:na]
+		self.min_gallop = max(min_gallop, 1)
+
+	def merge_hi(self, base_a, na, base_b, nb):
+		"""na > nb：B复制到缓冲区，自右向左归并。前提：B[0] < A[0]，A[-1] > B[-1]"""
+		alist, buf = self.alist, self.buf
+		buf[:nb] = alist[base_b:base_b + nb]
+		pa, pb, dest = base_a + na - 1, nb - 1, base_b + nb - 1
+		alist[dest] = alist[pa]
+		dest, pa = dest - 1, pa - 1
+		min_gallop = self.min_gallop
+		while pa >= base_a:
+			count_a = count_b = 0
+			while True:     # 逐对比较模式
+				if buf[pb] < alist[pa]:
+					alist[dest] = alist[pa]
+					dest, pa = dest - 1, pa - 1
+					count_a, count_b = count_a + 1, 0
+					if pa < base_a or count_a >= min_gallop:
+						break
+				else:
+					alist[dest] = buf[pb]
+					dest, pb = dest - 1, pb - 1
+					count_a, count_b = 0, count_b + 1
+					if count_b >= min_gallop:
+						break
+			while pa >= base_a:     # 飞奔模式
+				min_gallop -= min_gallop > 1
+				k = _gallop_right(buf[pb], alist, base_a, pa - base_a + 1, pa - base_a)
+				count_a = pa - base_a + 1 - k
+				if count_a:
+					dest, pa = dest - count_a, pa - count_a
+					alist[dest + 1:dest + 1 + count_a] = alist[pa + 1:pa + 1 + count_a]
+					if pa < base_a:
+						break
+				alist[dest] = buf[pb]
+				dest, pb = dest - 1, pb - 1
+				k = _gallop_left(alist[pa], buf, 0, pb + 1, pb)
+				count_b = pb + 1 - k
+				if count_b:
+					dest, pb = dest - count_b, pb - count_b
+					alist[dest + 1:dest + 1 + count_b] = buf[pb + 1:pb + 1 + count_b]
+				alist[dest] = alist[pa]
+				dest, pa = dest - 1, pa - 1
+				if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+					min_gallop += 1     # 飞奔收益低，提高阈值
+					break
+		# B[0]小于A中所有元素，因此A总是先耗尽
+		alist[base_a:base_a + pb + 1] = buf[:pb + 1]
+		self.min_gallop = max(min_gallop, 1)
+
+
+def merge_sort(alist: list, key=None, reverse=False):
+	"""
+	归并排序（自然归并）
+		·识别输入中已有的升序/严格降序游程，短游程用二分插入扩展
+		·按timsort的栈不变式归并游程，归并时复用同一块缓冲区，长游程进入飞奔模式
+		·稳定排序；近乎有序的输入接近线性时间
+	:param alist: 待排序列表（不会被修改）
+	:param key: 排序键函数，每个元素只调用一次
+	:param reverse: 是否降序（相等元素仍保持原顺序）
+	:return: 新的有序列表
+	"""
+	res = list(alist)
+	if key is not None or reverse:
+		_sort_keyed(lambda d: _MergeState(d).sort(0, len(d)), res, key, reverse)
+	else:
+		_MergeState(res).sort(0, len(res))
 	return res
 
 
-def gnome_sort(alist: list):
+def gnome_sort(alist: list, key=None, reverse=False):
 	"""侏儒排序"""
+	if key is not None or reverse:
+		return _sort_keyed(gnome_sort, alist, key, reverse)
 	i = 0
 	while i < len(alist):
 		if i == 0 or alist[i - 1] <= alist[i]:
@@ -123,7 +761,371 @@ def gnome_sort(alist: list):
 			i -= 1
 
 
+INT_TYPECODES = 'bBhHiIlLqQ'     # array.array的整数类型码
+INT_SORT_MIN = 256      # 短于此长度的整数序列不值得走整数排序
+RADIX_BITS = 8          # 基数排序每趟处理的最大位数（桶数组需驻留缓存）
+
+
+def counting_sort(alist: list, lo=None, hi=None):
+	"""
+	计数排序（原地），仅适用于整数
+	:param alist: 整数列表
+	:param lo: 最小值，缺省时扫描得到
+	:param hi: 最大值，缺省时扫描得到
+	:return: None
+	"""
+	if not alist:
+		return
+	if lo is None or hi is None:
+		lo, hi = min(alist), max(alist)
+	counts = [0] * (hi - lo + 1)
+	for x in alist:
+		counts[x - lo] += 1
+	pos = 0
+	for v, c in enumerate(counts, lo):
+		if c:
+			alist[pos:pos + c] = [v] * c
+			pos += c
+
+
+def radix_sort(alist: list):
+	"""
+	LSD基数排序（原地），仅适用于整数
+		·先减去最小值使所有元素非负，支持负数
+		·每趟按一个数位分桶，位数随n自适应，趟数为值域位数 / 每趟位数
+	"""
+	n = len(alist)
+	if n < 2:
+		return
+	lo = min(alist)
+	span_bits = (max(alist) - lo).bit_length()
+	if span_bits == 0:      # 所有元素相等
+		return
+	bits = min(RADIX_BITS, max(4, n.bit_length() - 1))
+	passes = -(-span_bits // bits)
+	bits = -(-span_bits // passes)      # 各趟位数尽量均匀
+	mask = (1 << bits) - 1
+	data = [x - lo for x in alist] if lo else list(alist)
+	for shift in range(0, passes * bits, bits):
+		buckets = [[] for _ in range(1 << bits)]
+		appends = [b.append for b in buckets]
+		for x in data:
+			appends[(x >> shift) & mask](x)
+		data = list(chain.from_iterable(buckets))
+	alist[:] = [x + lo for x in data] if lo else data
+
+
+def _int_sort_list(alist: list):
+	"""整数列表排序：值域不超过2n时计数排序，否则基数排序"""
+	lo, hi = min(alist), max(alist)
+	if hi - lo <= 2 * len(alist):
+		counting_sort(alist, lo, hi)
+	else:
+		radix_sort(alist)
+
+
+def _numpy():
+	"""按需导入NumPy：NumPy为可选依赖，缺失时返回None，整数排序退回纯Python实现"""
+	try:
+		import numpy
+	except ImportError:
+		return None
+	return numpy
+
+
+def _int_sort_numpy(arr):
+	"""NumPy整数数组原地排序：值域小时bincount计数排序，否则由NumPy的稳定排序完成（小整型即基数排序）"""
+	np = _numpy()
+	lo, hi = int(arr.min()), int(arr.max())
+	if hi - lo <= 2 * arr.size:
+		# 先扩宽再减去lo：在原dtype中相减，窄的有符号类型（如int8的[-128, 127]）会溢出成负数；
+		# 无符号类型中arr - lo不会回绕，而扩宽到intp可能溢出
+		if arr.dtype.kind == 'u':
+			offsets = (arr - arr.dtype.type(lo)).astype(np.intp)
+		else:
+			offsets = arr.astype(np.int64) - lo
+		counts = np.bincount(offsets, minlength=hi - lo + 1)
+		arr[:] = np.repeat(np.arange(lo, hi + 1, dtype=arr.dtype), counts)
+	else:
+		arr.sort(kind='stable')
+
+
+def sort(alist, key=None, reverse=False):
+	"""
+	排序分发器（原地）：按输入的类型、规模和值域选择后端
+		·NumPy整数数组                      -> 计数排序 / NumPy基数排序
+		·整数类型码的array.array            -> 零拷贝转为NumPy视图；无NumPy时转列表做纯Python整数排序
+		·纯整数列表（长度>=INT_SORT_MIN）   -> 计数排序 / LSD基数排序
+		·其他输入或指定了key                -> merge_sort
+	:param alist: list、array.array或numpy.ndarray
+	:param key: 排序键函数
+	:param reverse: 是否降序
+	:return: None
+	"""
+	n = len(alist)
+	if n < 2:
+		return
+	if key is None:
+		np = sys.modules.get('numpy')       # 输入是ndarray时NumPy必然已被导入，不必在此导入
+		if np is not None and isinstance(alist, np.ndarray) and alist.ndim == 1:
+			if alist.dtype.kind in 'iu':
+				_int_sort_numpy(alist)
+			else:
+				alist.sort(kind='stable')
+			if reverse:
+				alist[:] = alist[::-1].copy()
+			return
+		if isinstance(alist, array) and alist.typecode in INT_TYPECODES:
+			np = _numpy()
+			if np is not None:
+				_int_sort_numpy(np.frombuffer(alist, dtype=alist.typecode))
+				if reverse:
+					alist.reverse()
+			else:
+				res = alist.tolist()
+				_int_sort_list(res)
+				if reverse:
+					res.reverse()
+				alist[:] = array(alist.typecode, res)
+			return
+		if isinstance(alist, list) and n >= INT_SORT_MIN and set(map(type, alist)) == {int}:
+			_int_sort_list(alist)
+			if reverse:
+				alist.reverse()
+			return
+	res = merge_sort(alist, key, reverse)
+	if isinstance(alist, array):
+		alist[:] = array(alist.typecode, res)
+	else:
+		alist[:] = res
+
+
+SPILL_BLOCK = 1024      # 溢写文件中每个pickle帧包含的元素个数
+
+
+class _Desc:
+	"""降序归并时包装key，使小顶堆按key从大到小出队"""
+	__slots__ = ('key',)
+
+	def __init__(self, key):
+		self.key = key
+
+	def __lt__(self, other):
+		return other.key < self.key
+
+	def __eq__(self, other):
+		return self.key == other.key
+
+
+def _spill(pairs, tmpdir):
+	"""把有序的(key, item)序列分帧pickle到临时文件，返回回绕到开头的文件对象"""
+	f = tempfile.TemporaryFile(dir=tmpdir)
+	block = []
+	for pair in pairs:
+		block.append(pair)
+		if len(block) == SPILL_BLOCK:
+			pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+			block = []
+	if block:
+		pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+	f.seek(0)
+	return f
+
+
+def _read_run(f):
+	"""逐帧读取溢写文件，生成(key, item)"""
+	while True:
+		try:
+			block = pickle.load(f)
+		except EOFError:
+			return
+		yield from block
+
+
+def _kway_merge(runs, reverse):
+	"""
+	基于PriorQue2的多路归并，生成(key, item)
+	堆元素为(key, 游程序号, item)：key相等时按游程序号出队，保证稳定，item本身不参与比较
+	"""
+	heap, iters = PriorQue2([]), [iter(run) for run in runs]
+	for i, it in enumerate(iters):
+		for k, item in it:
+			heap.enqueue((_Desc(k) if reverse else k, i, item))
+			break
+	while not heap.is_empty():
+		k, i, item = heap.peek()
+		yield (k.key if reverse else k), item
+		for k, item in iters[i]:        # 同一游程的下一个元素顶替堆顶
+			heap.replace((_Desc(k) if reverse else k, i, item))
+			break
+		else:                           # 该游程已耗尽
+			heap.dequeue()
+
+
+def _read_lines(path):
+	"""按行读取文本文件（去掉行尾换行符）"""
+	with open(path) as f:
+		for line in f:
+			yield line.rstrip('\n')
+
+
+def external_sort(source, chunk_size=100000, fan_in=16, key=None, reverse=False, tmpdir=None):
+	"""
+	外部归并排序（生成器），用于内存放不下的输入
+		1. 按chunk_size分块读入，每块计算一次key后用merge_sort排序
+		2. 有序块分帧pickle溢写到临时文件（游程）
+		3. 游程数超过fan_in时分组归并成更长的游程，直到不超过fan_in
+		4. 最后一轮多路归并的结果以生成器形式流式返回
+	全部数据能放进一个块时不会溢写。排序是稳定的
+	:param source: 可迭代对象，或文本文件路径（按行排序）
+	:param chunk_size: 每块最多容纳的元素个数，即内存上限
+	:param fan_in: 每次多路归并的最大路数
+	:param key: 排序键函数
+	:param reverse: 是否降序
+	:param tmpdir: 临时文件目录，默认为系统临时目录
+	:return: 有序元素的生成器
+	"""
+	if chunk_size < 1 or fan_in < 2:
+		raise ValueError("in external_sort(): chunk_size must be >= 1 and fan_in must be >= 2.")
+	it = iter(_read_lines(source) if isinstance(source, str) else source)
+	runs = []
+	try:
+		chunk = list(islice(it, chunk_size))
+		while chunk:
+			pairs = [(e, e) for e in chunk] if key is None else [(key(e), e) for e in chunk]
+			del chunk
+			pairs = merge_sort(pairs, key=itemgetter(0), reverse=reverse)
+			rest = list(islice(it, 1))
+			if not rest and not runs:       # 只有一块，无需溢写
+				for _, e in pairs:
+					yield e
+				return
+			runs.append(_spill(pairs, tmpdir))
+			del pairs
+			chunk = rest + list(islice(it, chunk_size - 1)) if rest else []
+
+		while len(runs) > fan_in:           # 多趟归并
+			merged = []
+			for i in range(0, len(runs), fan_in):
+				group = runs[i:i + fan_in]
+				if len(group) == 1:
+					merged.append(group[0])
+					continue
+				merged.append(_spill(_kway_merge([_read_run(f) for f in group], reverse), tmpdir))
+				for f in group:
+					f.close()
+			runs = merged
+
+		for _, e in _kway_merge([_read_run(f) for f in runs], reverse):
+			yield e
+	finally:
+		for f in runs:
+			f.close()
+
+
+PARALLEL_MIN = 200000   # 短于此长度时进程启动开销大于收益，直接单进程排序
+OVERSAMPLING = 32       # 每个桶的采样个数
+
+
+def _sort_bucket(bucket):
+	"""子进程：对一个桶做稳定排序"""
+	return merge_sort(bucket)
+
+
+def _sort_shared_segment(name, typecode, lo, hi):
+	"""子进程：对共享内存中[lo, hi)区段原地排序"""
+	shm = SharedMemory(name=name)
+	view = shm.buf.cast(typecode)
+	try:
+		seg = view[lo:hi].tolist()
+		sort(seg)
+		view[lo:hi] = array(typecode, seg)
+	finally:
+		view.release()
+		shm.close()
+
+
+def _splitters(alist, workers):
+	"""采样选取workers - 1个分割元素"""
+	s = sorted(sample(range(len(alist)), min(len(alist), workers * OVERSAMPLING)))
+	picked = merge_sort([alist[i] for i in s])
+	return [picked[j * len(picked) // workers] for j in range(1, workers)]
+
+
+def _parallel_shared(alist: array, workers):
+	"""数值型array.array：分桶后写入共享内存，各进程原地排序各自的区段，免去桶数据的序列化"""
+	typecode, n = alist.typecode, len(alist)
+	splitters = _splitters(alist, workers)
+	buckets = [array(typecode) for _ in range(workers)]
+	appends = [b.append for b in buckets]
+	for e in alist:
+		appends[bisect_right(splitters, e)](e)
+
+	shm = SharedMemory(create=True, size=n * alist.itemsize)
+	view = shm.buf.cast(typecode)
+	try:
+		bounds, pos = [], 0
+		for b in buckets:
+			view[pos:pos + len(b)] = b
+			bounds.append((pos, pos + len(b)))
+			pos += len(b)
+		del buckets, appends
+		with ProcessPoolExecutor(workers) as ex:
+			futures = [ex.submit(_sort_shared_segment, shm.name, typecode, lo, hi) for lo, hi in bounds if hi - lo > 1]
+			for f in futures:
+				f.result()
+		res = array(typecode)
+		res.frombytes(shm.buf[:n * alist.itemsize])
+		return res
+	finally:
+		view.release()
+		shm.close()
+		shm.unlink()
+
+
+def parallel_sort(alist, key=None, reverse=False, workers=None, min_size=PARALLEL_MIN):
+	"""
+	多进程并行样本排序（sample sort）
+		1. 随机采样并排序，取workers - 1个分割元素
+		2. 按bisect_right分桶：相等的key总落在同一个桶中，桶内保持原顺序
+		3. 各桶在ProcessPoolExecutor中稳定排序（数值型array.array经共享内存传递）
+		4. 按桶的顺序拼接
+	结果与merge_sort(alist, key, reverse)完全一致；长度不足min_size或只有一个进程时直接调用merge_sort
+	:param alist: 待排序序列（不会被修改），元素须可pickle
+	:param key: 排序键函数，在主进程中每个元素计算一次
+	:param reverse: 是否降序
+	:param workers: 进程数，默认为CPU核数
+	:param min_size: 启用并行的最小长度
+	:return: 新的有序列表；数值型array.array返回同类型码的新array
+	"""
+	n = len(alist)
+	workers = workers or os.cpu_count() or 1
+	if n < min_size or workers < 2:
+		res = merge_sort(alist, key, reverse)
+		return array(alist.typecode, res) if isinstance(alist, array) else res
+	if key is not None or reverse:
+		decorated = _decorate(alist, key, reverse)
+		res = _undecorate(alist, parallel_sort(decorated, workers=workers, min_size=min_size), reverse)
+		return array(alist.typecode, res) if isinstance(alist, array) else res
+	if isinstance(alist, array) and alist.typecode in INT_TYPECODES + 'fd':
+		return _parallel_shared(alist, workers)
+
+	splitters = _splitters(alist, workers)
+	buckets = [[] for _ in range(workers)]
+	appends = [b.append for b in buckets]
+	for e in alist:
+		appends[bisect_right(splitters, e)](e)
+	with ProcessPoolExecutor(workers) as ex:
+		return list(chain.from_iterable(ex.map(_sort_bucket, buckets)))
+
+
 if __name__ == '__main__':
+	# 窄整型的满值域，元素足够多时走计数排序（值域 <= 2n）
+	for tc, lo_, hi_, n_ in (('b', -128, 127, 300), ('h', -32768, 32767, 40000), ('B', 0, 255, 300)):
+		arr_ = array(tc, [randint(lo_, hi_) for _ in range(n_)] + [lo_, hi_])
+		expected_ = sorted(arr_)
+		sort(arr_)
+		assert arr_.tolist() == expected_, tc
 	a = [19, 59, 34, 62, 23, 81, 51, 94, 45, 56, 7]
 	print(a)
 	gnome_sort(a)
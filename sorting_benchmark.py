@@ -0,0 +1,288 @@
+"""
+排序算法基准测试与回归检查
+
+	对sorting.py中的各排序算法以及priority_queue.heap_sort，在多种输入分布和规模下测量：
+		·seconds：多次运行取最好的墙钟时间
+		·comparisons：元素比较次数（用计数包装类统计；只接受int的计数/基数排序不统计，
+		  并行排序只统计主进程中的比较）
+		·moves：写入输入列表的元素个数（返回新列表的算法只统计写回输入列表的部分）
+		·peak_bytes：tracemalloc统计的排序过程中的峰值内存
+	结果写入JSON文件，并可与保存的基线结果对比，标记出退化的条目
+
+	用法：
+		python sorting_benchmark.py --sizes 100,1000,10000 --out bench.json
+		python sorting_benchmark.py --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from random import Random
+
+import sorting
+from priority_queue import heap_sort
+
+
+def _random(n, rng):
+	return [rng.randrange(n * 10) for _ in range(n)]
+
+
+def _sorted(n, rng):
+	return sorted(_random(n, rng))
+
+
+def _reversed(n, rng):
+	return sorted(_random(n, rng), reverse=True)
+
+
+def _sawtooth(n, rng):
+	"""若干段升序的锯齿"""
+	period = max(1, int(n ** 0.5))
+	return [i % period for i in range(n)]
+
+
+def _few_unique(n, rng):
+	return [rng.randrange(8) for _ in range(n)]
+
+
+def _organ_pipe(n, rng):
+	"""先升后降"""
+	half = n // 2
+	return list(range(half)) + list(range(n - half, 0, -1))
+
+
+DISTRIBUTIONS = {
+	'random': _random,
+	'sorted': _sorted,
+	'reversed': _reversed,
+	'sawtooth': _sawtooth,
+	'few_unique': _few_unique,
+	'organ_pipe': _organ_pipe,
+}
+
+
+def _inplace(func, **kwargs):
+	"""把原地排序函数包装成返回结果列表的形式"""
+	def run(alist):
+		func(alist, **kwargs)
+		return alist
+	return run
+
+
+def _external(alist):
+	"""外部排序：块较小、路数较少，较大的规模会溢写并经过多轮归并"""
+	return list(sorting.external_sort(alist, chunk_size=EXTERNAL_CHUNK, fan_in=4))
+
+
+def _parallel(alist):
+	"""并行排序：取消最小长度限制并固定进程数，单核机器上也走多进程路径"""
+	return sorting.parallel_sort(alist, workers=2, min_size=0)
+
+
+QUADRATIC_MAX = 10 ** 4     # O(n^2)算法只测到这个规模
+RECURSIVE_MAX = 500          # 以首元素为枢轴递归的快排，有序输入时递归深度为n，须低于默认的递归上限1000
+EXTERNAL_CHUNK = 10 ** 4
+INT_ONLY = {'radix_sort', 'counting_sort'}      # 只接受int，跳过比较次数统计
+
+# 名称 -> (返回有序列表的函数, 最大规模)
+ALGORITHMS = {
+	'bubble_sort': (_inplace(sorting.bubble_sort), QUADRATIC_MAX),
+	'select_sort': (_inplace(sorting.select_sort), QUADRATIC_MAX),
+	'insert_sort': (_inplace(sorting.insert_sort), QUADRATIC_MAX),
+	'insert_sort_binary': (_inplace(sorting.insert_sort, binary=True), QUADRATIC_MAX),
+	'gnome_sort': (_inplace(sorting.gnome_sort), QUADRATIC_MAX),
+	'shell_sort': (_inplace(sorting.shell_sort), None),
+	'quick_sort': (_inplace(sorting.quick_sort), None),
+	'quick_sort_3way': (_inplace(sorting.quick_sort, mode='3way'), None),
+	'quick_sort_classic': (_inplace(sorting.quick_sort, mode='classic'), RECURSIVE_MAX),
+	'quick_sort2': (sorting.quick_sort2, RECURSIVE_MAX),
+	'merge_sort': (sorting.merge_sort, None),
+	'heap_sort': (_inplace(heap_sort), None),
+	'sort': (_inplace(sorting.sort), None),
+	'counting_sort': (_inplace(sorting.counting_sort), None),
+	'radix_sort': (_inplace(sorting.radix_sort), None),
+	'external_sort': (_external, None),
+	'parallel_sort': (_parallel, None),
+}
+
+
+class _Counted:
+	"""统计比较次数的元素包装"""
+	__slots__ = ('v',)
+	count = 0
+
+	def __init__(self, v):
+		self.v = v
+
+	def __lt__(self, other):
+		_Counted.count += 1
+		return self.v < other.v
+
+	def __le__(self, other):
+		_Counted.count += 1
+		return self.v <= other.v
+
+	def __gt__(self, other):
+		_Counted.count += 1
+		return self.v > other.v
+
+	def __ge__(self, other):
+		_Counted.count += 1
+		return self.v >= other.v
+
+	def __eq__(self, other):
+		_Counted.count += 1
+		return self.v == other.v
+
+	__hash__ = None
+
+
+class _CountingList(list):
+	"""统计写入次数的列表"""
+
+	def __init__(self, iterable):
+		super(_CountingList, self).__init__(iterable)
+		self.moves = 0
+
+	def __setitem__(self, index, value):
+		if isinstance(index, slice):
+			value = list(value)
+			self.moves += len(value)
+		else:
+			self.moves += 1
+		super(_CountingList, self).__setitem__(index, value)
+
+
+def run_case(name, dist, n, seed=0, repeat=3, counts=True, memory=True):
+	"""
+	运行一个测试条目
+	:return: 结果字典
+	"""
+	func, _ = ALGORITHMS[name]
+	data = DISTRIBUTIONS[dist](n, Random(seed))
+	expected = sorted(data)
+
+	best, ok = float('inf'), True
+	for _ in range(repeat):
+		alist = list(data)
+		start = time.perf_counter()
+		res = func(alist)
+		best = min(best, time.perf_counter() - start)
+		ok = ok and res == expected
+	record = {'algorithm': name, 'distribution': dist, 'n': n, 'seconds': best, 'ok': ok}
+
+	if memory:
+		alist = list(data)
+		tracemalloc.start()
+		func(alist)
+		record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+
+	if counts and name not in INT_ONLY:
+		alist = _CountingList(_Counted(v) for v in data)
+		_Counted.count = 0
+		func(alist)
+		record['comparisons'] = _Counted.count
+		record['moves'] = alist.moves
+	return record
+
+
+def run_suite(sizes, algorithms=None, distributions=None, seed=0, repeat=3, counts=True, memory=True, log=None):
+	"""运行全部条目，超过算法最大规模的条目跳过；条目抛出异常时记为ok: False并继续"""
+	results = []
+	for name in algorithms or ALGORITHMS:
+		max_n = ALGORITHMS[name][1]
+		for dist in distributions or DISTRIBUTIONS:
+			for n in sizes:
+				if max_n is not None and n > max_n:
+					continue
+				try:
+					record = run_case(name, dist, n, seed, repeat, counts, memory)
+				except Exception as e:
+					if tracemalloc.is_tracing():
+						tracemalloc.stop()
+					record = {'algorithm': name, 'distribution': dist, 'n': n, 'seconds': float('nan'),
+							'ok': False, 'error': "{}: {}".format(type(e).__name__, e)}
+				results.append(record)
+				if log is not None:
+					log(record)
+	return results
+
+
+# 计数和字节指标的最小绝对增量，低于此值的变化视为噪声
+MIN_DELTA = {'comparisons': 100, 'moves': 100, 'peak_bytes': 4096}
+
+
+def compare(results, baseline, tolerance=0.2, min_seconds=1e-3, min_delta=None):
+	"""
+	与基线对比
+		·seconds超过基线的(1 + tolerance)倍（两者都不小于min_seconds时才比较）
+		·comparisons、moves、peak_bytes超过基线的(1 + tolerance)倍，且增量不小于min_delta中的值（默认MIN_DELTA）
+		·结果不正确
+	:return: 退化条目的描述列表
+	"""
+	min_delta = MIN_DELTA if min_delta is None else min_delta
+	index = {(r['algorithm'], r['distribution'], r['n']): r for r in baseline}
+	regressions = []
+	for r in results:
+		case = (r['algorithm'], r['distribution'], r['n'])
+		if not r['ok']:
+			regressions.append("{} {} n={}: {}".format(*case, r.get('error', 'wrong result')))
+		base = index.get(case)
+		if base is None:
+			continue
+		for metric in ('seconds', 'comparisons', 'moves', 'peak_bytes'):
+			if metric not in r or metric not in base:
+				continue
+			old, new = base[metric], r[metric]
+			if metric == 'seconds' and max(old, new) < min_seconds:
+				continue
+			if new - old < min_delta.get(metric, 0):
+				continue
+			if new > old * (1 + tolerance):
+				regressions.append("{} {} n={}: {} {:.6g} -> {:.6g} (+{:.0%})".format(
+					*case, metric, old, new, (new - old) / old if old else float('inf')))
+	return regressions
+
+
+def _format(record):
+	return "{algorithm:>18} {distribution:>10} n={n:<8} {seconds:10.6f}s".format(**record) + \
+		"".join(" {}={}".format(k, record[k]) for k in ('comparisons', 'moves', 'peak_bytes') if k in record) + \
+		("" if record['ok'] else " " + record.get('error', 'WRONG'))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="sorting.py benchmark and regression check")
+	parser.add_argument('--sizes', default='100,1000,10000,100000,1000000')
+	parser.add_argument('--algorithms', default=','.join(ALGORITHMS))
+	parser.add_argument('--distributions', default=','.join(DISTRIBUTIONS))
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--no-counts', action='store_true', help="skip comparison/move counting")
+	parser.add_argument('--no-memory', action='store_true', help="skip peak memory measurement")
+	parser.add_argument('--out', default='sorting_benchmark.json')
+	parser.add_argument('--baseline', help="baseline JSON to compare against")
+	parser.add_argument('--tolerance', type=float, default=0.2)
+	args = parser.parse_args(argv)
+
+	results = run_suite(
+		[int(float(s)) for s in args.sizes.split(',')],
+		args.algorithms.split(','), args.distributions.split(','),
+		args.seed, args.repeat, not args.no_counts, not args.no_memory,
+		log=lambda r: print(_format(r), flush=True))
+	with open(args.out, 'w') as f:
+		json.dump(results, f, indent=1)
+
+	regressions = []
+	if args.baseline:
+		with open(args.baseline) as f:
+			regressions = compare(results, json.load(f), args.tolerance)
+		for line in regressions:
+			print("REGRESSION", line)
+	return 1 if regressions or not all(r['ok'] for r in results) else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())